@@ -4,24 +4,948 @@ This includes mssqlStream and mssqlConnector.
 """
 from __future__ import annotations
 
+import os
+import re
+import sys
+import copy
 import gzip
 import json
+import time
+import queue
 import datetime
+import threading
 
-from base64 import b64encode
+from base64 import b64decode, b64encode
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
 from decimal import Decimal
+from itertools import islice
+from pathlib import Path
 from uuid import uuid4
-from typing import Any, Iterable, Iterator
+from typing import Any, Callable, Iterable, Iterator, Sequence
 
 import pendulum
 import pyodbc
 import sqlalchemy
 
+from sqlalchemy.dialects import mssql
 from sqlalchemy.engine import Engine
 from sqlalchemy.engine.url import URL
 
+from fs.base import FS
 from singer_sdk import SQLConnector, SQLStream
 from singer_sdk.batch import BaseBatcher, lazy_chunked_generator
+from singer_sdk.helpers._batch import BaseBatchFileEncoding, BatchConfig, StorageTarget
+
+from tap_mssql.instrumentation import StreamTimings, profile, write_metrics_file
+from tap_mssql.serializers import (
+    JSONSerializer,
+    OrjsonSerializer,
+    get_serializer,
+    orjson
+)
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+DEFAULT_FETCH_SIZE = 10000
+ARROW_BATCH_FORMATS = ("parquet", "arrow")
+JSONSCHEMA_TYPE_CACHE_SIZE = 1024
+# The read_isolation settings and the isolation levels they read at.
+# READ COMMITTED reads row versions when the database has
+# READ_COMMITTED_SNAPSHOT on, READ UNCOMMITTED is the same as NOLOCK.
+READ_ISOLATION_LEVELS = {
+    "snapshot": "SNAPSHOT",
+    "read_committed_snapshot": "READ COMMITTED",
+    "read_uncommitted": "READ UNCOMMITTED",
+}
+# The CDC columns changes are ordered on, selected after the table columns
+CDC_ORDER_COLUMNS = ("__$start_lsn", "__$seqval", "__$operation")
+# __$operation of a deleted row
+CDC_DELETE = 1
+# The characters or bytes of a LOB value read per query by the file policy
+LOB_CHUNK_SIZE = 1024 * 1024
+# Assumed characters of a string or binary column with no length, such
+# as NVARCHAR(MAX), until batches of it have been measured
+UNBOUNDED_VALUE_SIZE = 8000
+# The largest adaptive fetch or batch file size in rows
+MAX_ADAPTIVE_BATCH_ROWS = 1000000
+BINARY_TYPES = (sqlalchemy.types.LargeBinary, sqlalchemy.types.BINARY, sqlalchemy.types.VARBINARY)
+
+
+@dataclass
+class ParquetEncoding(BaseBatchFileEncoding):
+    """Parquet encoding for batch files."""
+
+    __encoding_format__ = "parquet"
+
+
+@dataclass
+class ArrowEncoding(BaseBatchFileEncoding):
+    """Arrow IPC file encoding for batch files."""
+
+    __encoding_format__ = "arrow"
+
+
+def build_session_initializer(
+        session_statements: Sequence[str],
+     ) -> Callable[[Any, Any], None]:
+    """Return a pool connect listener that runs statements on a new connection.
+
+    The statements are session settings such as SET NOCOUNT ON, so they
+    are run once when the DBAPI connection is opened and last as long
+    as it stays in the pool.
+
+    Args:
+        session_statements: The SQL statements to run.
+
+    Returns:
+        A listener for the engine "connect" event.
+    """
+    def run_session_statements(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in session_statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    return run_session_statements
+
+
+def pool_capacity(pool: sqlalchemy.pool.Pool) -> int | None:
+    """Return the most connections a pool can have checked out at once.
+
+    Args:
+        pool: The engine's pool.
+
+    Returns:
+        `pool_size` plus `max_overflow` for a QueuePool, or None when
+        the pool has no limit.
+    """
+    if not isinstance(pool, sqlalchemy.pool.QueuePool) or pool._max_overflow < 0:
+        return None
+    return pool.size() + pool._max_overflow
+
+
+def prewarm_pool(engine: Engine, count: int) -> None:
+    """Open connections in the engine pool before they are needed.
+
+    The connections are opened at the same time on a pool of threads,
+    so their login and TLS handshakes overlap, and are then returned to
+    the pool. Only as many as `pool_size` stay open. The count must not
+    be above pool_capacity(), the connections beyond it would wait for
+    `pool_timeout` and fail.
+
+    Args:
+        engine: The engine to warm up.
+        count: The number of connections to open.
+    """
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        futures = [executor.submit(engine.connect) for _ in range(count)]
+
+    try:
+        for future in futures:
+            future.result()
+    finally:
+        for future in futures:
+            if future.exception() is None:
+                future.result().close()
+
+
+class RowVersion(sqlalchemy.types.TypeDecorator):
+    """A ROWVERSION (TIMESTAMP) column read and bound as an unsigned integer.
+
+    SQL Server stores rowversions as binary(8) that increases on every
+    write. As an integer they can be bookmarked and compared in Python,
+    and bound back as binary(8) so SQL Server compares them as binary.
+    """
+
+    impl = mssql.TIMESTAMP
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Any) -> Any:
+        """Return an integer as binary(8)."""
+        if isinstance(value, int):
+            return value.to_bytes(8, "big")
+        return value
+
+    def process_result_value(self, value: Any, dialect: Any) -> Any:
+        """Return binary(8) as an integer."""
+        if value is None:
+            return None
+        return int.from_bytes(value, "big")
+
+    @property
+    def python_type(self) -> type:
+        """Rowversions are read as int."""
+        return int
+
+
+def jsonschema_type_signature(
+        from_type: str
+        | sqlalchemy.types.TypeEngine
+        | type[sqlalchemy.types.TypeEngine],
+     ) -> tuple:
+    """Return the parts of a SQL type its JSON Schema depends on.
+
+    Args:
+        from_type: The SQL type as a string or as a TypeEngine.
+
+    Returns:
+        A hashable tuple of the type, length, precision, and scale.
+    """
+    if isinstance(from_type, sqlalchemy.types.TypeEngine):
+        return (
+            type(from_type),
+            getattr(from_type, 'length', None),
+            getattr(from_type, 'precision', None),
+            getattr(from_type, 'scale', None),
+        )
+    return (from_type, None, None, None)
+
+
+def date_to_isoformat(value: Any) -> Any:
+    """Return dates and datetimes in ISO format, other values as is."""
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return value
+
+
+def binary_to_base64(value: bytes) -> str:
+    """Return binary data as a base64 string."""
+    return b64encode(value).decode()
+
+
+def build_row_converters(schema: dict) -> list[tuple[str, Callable]]:
+    """Return the (column, converter) pairs a stream's rows need.
+
+    Only columns that need converting are returned so rows can be
+    transformed without looking at the schema again.
+
+    Args:
+        schema: The stream's selected JSON schema.
+
+    Returns:
+        A list of column names paired with their converter.
+    """
+    row_converters: list[tuple[str, Callable]] = []
+    for key, property_schema in schema.get('properties', {}).items():
+        # Encode base64 binary fields in the record
+        if property_schema.get('contentEncoding') == 'base64':
+            row_converters.append((key, binary_to_base64))
+        # Date in ISO format
+        elif property_schema.get('format') in ('date-time', 'date'):
+            row_converters.append((key, date_to_isoformat))
+    return row_converters
+
+
+def build_row_transformer(
+        column_names: list[str],
+        row_converters: list[tuple[str, Callable]],
+     ) -> Callable[[Sequence], dict]:
+    """Return a function that turns a row tuple into a converted record.
+
+    The converters are matched to column positions once so each row
+    is converted in place and the record dict is built only once.
+
+    Args:
+        column_names: The column names in the order the row holds them.
+        row_converters: Pairs returned by build_row_converters().
+
+    Returns:
+        A function taking a row tuple and returning a record dict.
+    """
+    indexed_converters = [
+        (column_names.index(key), converter)
+        for key, converter in row_converters
+        if key in column_names
+    ]
+
+    if not indexed_converters:
+        return lambda row: dict(zip(column_names, row))
+
+    def transform(row: Sequence) -> dict:
+        values = list(row)
+        for index, converter in indexed_converters:
+            value = values[index]
+            if value is not None:
+                values[index] = converter(value)
+        return dict(zip(column_names, values))
+
+    return transform
+
+
+def odbc_binary_to_base64(value: bytes | None) -> str | None:
+    """Return a VARBINARY value as base64, registered as a pyodbc output converter."""
+    if value is None:
+        return None
+    return b64encode(value).decode()
+
+
+def sql_convert(
+        column: sqlalchemy.Column,
+        sql_type: str,
+        style: int | None = None
+     ) -> sqlalchemy.sql.ColumnElement:
+    """Return CONVERT(sql_type, column[, style]) typed as a string."""
+    arguments = [sqlalchemy.literal_column(sql_type), column]
+    if style is not None:
+        arguments.append(sqlalchemy.literal_column(str(style)))
+    return sqlalchemy.func.CONVERT(*arguments, type_=sqlalchemy.String())
+
+
+def build_native_query(
+        table: sqlalchemy.Table,
+        driver_type: str,
+        skip_columns: Sequence[str] = (),
+     ) -> tuple[sqlalchemy.sql.Select, set[str]]:
+    """Return a select of a table that has its values converted natively.
+
+    Temporal columns are converted to ISO 8601 strings by SQL Server
+    with CONVERT(), so no datetime objects are built and formatted in
+    Python. UNIQUEIDENTIFIER columns are converted to strings too on
+    pymssql, pyodbc already returns them as strings. On pyodbc
+    VARBINARY and IMAGE columns are base64 encoded by an output
+    converter, carried in the `output_converters` execution option of
+    the select for mssqlConnector.stream_rows() to register. The
+    converter applies to every VARBINARY value of the result, so it is
+    not used when a skipped column is VARBINARY or IMAGE. BINARY
+    columns are left alone because ROWVERSION and CDC LSN values are
+    read as BINARY too.
+
+    Args:
+        table: The table to select from.
+        driver_type: pyodbc or pymssql.
+        skip_columns: Columns to select unconverted, such as the
+            replication key and primary keys.
+
+    Returns:
+        The select and the names of the columns it converts.
+    """
+    binary_types = (sqlalchemy.types.VARBINARY, mssql.IMAGE)
+    # Key values must stay bytes to be bookmarked and paged on
+    convert_binary = driver_type == 'pyodbc' and not any(
+        isinstance(column.type, binary_types)
+        for column in table.columns
+        if column.name in skip_columns
+    )
+
+    columns: list = []
+    converted_columns: set[str] = set()
+    for column in table.columns:
+        column_type = column.type
+        expression = None
+        if column.name in skip_columns:
+            pass
+        elif isinstance(column_type, sqlalchemy.types.DateTime):
+            # Style 126 is yyyy-mm-ddThh:mi:ss.fffffff with the offset
+            # of a DATETIMEOFFSET
+            expression = sql_convert(column, 'VARCHAR(34)', 126)
+        elif isinstance(column_type, sqlalchemy.types.Date):
+            # Style 23 is yyyy-mm-dd
+            expression = sql_convert(column, 'CHAR(10)', 23)
+        elif isinstance(column_type, sqlalchemy.types.Time):
+            expression = sql_convert(column, 'VARCHAR(16)')
+        elif isinstance(column_type, mssql.UNIQUEIDENTIFIER):
+            if driver_type == 'pymssql':
+                expression = sqlalchemy.func.LOWER(
+                    sql_convert(column, 'CHAR(36)'),
+                    type_=sqlalchemy.String()
+                )
+        elif isinstance(column_type, binary_types):
+            if convert_binary:
+                # The driver returns a str, so skip the bytes() result
+                # processor of the binary type
+                expression = sqlalchemy.type_coerce(column, sqlalchemy.String())
+
+        if expression is None:
+            columns.append(column)
+        else:
+            columns.append(expression.label(column.name))
+            converted_columns.add(column.name)
+
+    query = sqlalchemy.select(*columns)
+    if convert_binary and any(
+        isinstance(table.columns[name].type, binary_types)
+        for name in converted_columns
+    ):
+        query = query.execution_options(output_converters={
+            pyodbc.SQL_VARBINARY: odbc_binary_to_base64,
+            pyodbc.SQL_LONGVARBINARY: odbc_binary_to_base64,
+        })
+    return query, converted_columns
+
+
+def lob_source(
+        expression: sqlalchemy.sql.ColumnElement,
+        column_type: sqlalchemy.types.TypeEngine
+     ) -> sqlalchemy.sql.ColumnElement:
+    """Return a LOB column as a MAX type SUBSTRING() and HASHBYTES() take.
+
+    Args:
+        expression: The column or expression selecting it.
+        column_type: The SQL type of the column.
+
+    Returns:
+        XML, NTEXT, TEXT, and IMAGE converted to NVARCHAR(MAX),
+        VARCHAR(MAX), or VARBINARY(MAX), other types unchanged.
+    """
+    if isinstance(column_type, (mssql.XML, mssql.NTEXT)):
+        return sql_convert(expression, 'NVARCHAR(MAX)')
+    if isinstance(column_type, sqlalchemy.types.TEXT):
+        return sql_convert(expression, 'VARCHAR(MAX)')
+    if isinstance(column_type, mssql.IMAGE):
+        return sql_convert(expression, 'VARBINARY(MAX)')
+    return expression
+
+
+def computed_column_schema(column_type: str | None) -> dict:
+    """Return the JSON schema of a computed column.
+
+    Args:
+        column_type: The `type` set for the column in `computed_columns`,
+            string when not set.
+
+    Returns:
+        The nullable JSON schema property of the column.
+    """
+    if column_type in ('date-time', 'date'):
+        return {'type': ['string', 'null'], 'format': column_type}
+    return {'type': [column_type or 'string', 'null']}
+
+
+def column_python_type(column_type: sqlalchemy.types.TypeEngine) -> type | None:
+    """Return the Python type of a column's values.
+
+    Args:
+        column_type: The SQL type of the column.
+
+    Returns:
+        The type, or None for types SQLAlchemy has no Python type for,
+        such as UNIQUEIDENTIFIER and SQL_VARIANT.
+    """
+    try:
+        return column_type.python_type
+    except NotImplementedError:
+        return None
+
+
+def split_range(lower: Any, upper: Any, count: int) -> list:
+    """Return the boundaries that split lower..upper into count ranges.
+
+    Works for int, Decimal, date, and datetime values. Duplicate
+    boundaries, which happen when there are fewer values than ranges,
+    are dropped.
+
+    Args:
+        lower: The smallest value in the range.
+        upper: The largest value in the range.
+        count: The number of ranges wanted.
+
+    Returns:
+        A sorted list of at most count - 1 inner boundaries.
+    """
+    boundaries: list = []
+    for i in range(1, count):
+        if isinstance(lower, int):
+            boundary = lower + ((upper - lower) * i) // count
+        else:
+            boundary = lower + ((upper - lower) * i) / count
+        if lower < boundary <= upper and boundary not in boundaries:
+            boundaries.append(boundary)
+    return boundaries
+
+
+def keyset_predicate(
+        columns: Sequence[sqlalchemy.Column],
+        values: Sequence[Any],
+     ) -> sqlalchemy.sql.ColumnElement:
+    """Return a WHERE clause for the rows after values in columns order.
+
+    This is (columns) > (values) written out, as SQL Server has no row
+    value comparison. NULLs sort first in SQL Server, so every non NULL
+    value comes after a NULL.
+
+    Args:
+        columns: The ORDER BY columns.
+        values: The values of the last row read, one per column.
+
+    Returns:
+        The WHERE clause.
+    """
+    column, value = columns[0], values[0]
+    if value is None:
+        after = column.isnot(None)
+        same = column.is_(None)
+    else:
+        after = column > value
+        same = column == value
+
+    if len(columns) == 1:
+        return after
+    return sqlalchemy.or_(
+        after,
+        sqlalchemy.and_(same, keyset_predicate(columns[1:], values[1:]))
+    )
+
+
+def to_bookmark_value(value: Any) -> Any:
+    """Return a record's key value as it is saved in the stream state.
+
+    Records of Parquet and Arrow batches keep their Python values, so
+    dates and times are saved as ISO strings and binary as base64 like
+    in JSON records, which from_bookmark_value() reads back.
+
+    Args:
+        value: The value of the key in a record.
+
+    Returns:
+        A JSON compatible value.
+    """
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return binary_to_base64(value)
+    return value
+
+
+def from_bookmark_value(value: Any, column_type: sqlalchemy.types.TypeEngine) -> Any:
+    """Return a key value saved from a record as the column's Python value.
+
+    Records have dates and times as ISO strings and binary as base64,
+    which SQL Server would not compare with DATETIME or BINARY keys
+    as the values they came from.
+
+    Args:
+        value: The value of the key in a record.
+        column_type: The SQL type of the key column.
+
+    Returns:
+        The value to compare the key column with.
+    """
+    if value is None:
+        return None
+    try:
+        python_type = column_type.python_type
+    except NotImplementedError:
+        return value
+
+    if python_type is datetime.datetime:
+        return datetime.datetime.fromisoformat(value)
+    if python_type is datetime.date:
+        return datetime.date.fromisoformat(value)
+    if python_type is datetime.time:
+        return datetime.time.fromisoformat(value)
+    if python_type is bytes:
+        return b64decode(value)
+    return value
+
+
+def fetch_concurrently(
+        batch_iterators: list[Iterator[list]],
+        max_workers: int,
+     ) -> Iterator[list]:
+    """Drain several batch iterators at once on a pool of threads.
+
+    Batches are handed back through a bounded queue in the order
+    they arrive, so the order across iterators is not kept. The
+    queue holds two batches per worker which keeps memory flat when
+    the consumer is slower than the database.
+
+    Args:
+        batch_iterators: Lazy iterators, such as mssqlConnector.stream_rows().
+        max_workers: The number of iterators drained at the same time.
+
+    Yields:
+        Each batch from each of the iterators.
+
+    Raises:
+        Exception: The first error raised by any of the iterators.
+    """
+    output: queue.Queue = queue.Queue(maxsize=max_workers * 2)
+    stop = threading.Event()
+    finished = object()
+
+    def put(item: Any) -> None:
+        while not stop.is_set():
+            try:
+                output.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def drain(iterator: Iterator[list]) -> None:
+        try:
+            for batch in iterator:
+                if stop.is_set():
+                    break
+                put(batch)
+        except Exception as ex:  # noqa: BLE001
+            put(ex)
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close()
+            put(finished)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for iterator in batch_iterators:
+                executor.submit(drain, iterator)
+            remaining = len(batch_iterators)
+            while remaining:
+                item = output.get()
+                if item is finished:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stop.set()
+
+
+def estimate_batch_size(batch: list) -> int:
+    """Return the approximate memory size of a batch of rows in bytes.
+
+    Only the first and last rows are measured, so this stays cheap for
+    large batches.
+
+    Args:
+        batch: A batch of rows.
+
+    Returns:
+        The estimated size in bytes.
+    """
+    if not batch:
+        return 0
+    sample = (batch[0], batch[-1])
+    sample_size = sum(sys.getsizeof(value) for row in sample for value in row)
+    return sample_size * len(batch) // len(sample)
+
+
+def estimate_record_size(schema: dict) -> int:
+    """Return the approximate JSON size of a record of a schema in bytes.
+
+    Strings are assumed to be as long as their maxLength, the column
+    length hd_to_jsonschema_type() sets, and UNBOUNDED_VALUE_SIZE when
+    they have none. Base64 strings are 4/3 of the binary length.
+
+    Args:
+        schema: The stream's selected JSON schema.
+
+    Returns:
+        The estimated size in bytes.
+    """
+    size = 2
+    for name, property_schema in schema.get('properties', {}).items():
+        # Quotes, colon, and comma around the key
+        size += len(name) + 4
+        types = property_schema.get('type') or []
+        types = [types] if isinstance(types, str) else types
+        if property_schema.get('format') == 'date-time':
+            size += 34
+        elif property_schema.get('format') in ('date', 'time'):
+            size += 18
+        elif 'string' in types:
+            length = property_schema.get('maxLength') or UNBOUNDED_VALUE_SIZE
+            if property_schema.get('contentEncoding') == 'base64':
+                length = length * 4 // 3
+            size += length + 2
+        elif 'number' in types:
+            size += 24
+        elif 'integer' in types:
+            size += 12
+        else:
+            size += 8
+    return size
+
+
+class AdaptiveBatchSize:
+    """A batch size in rows that keeps batches near a target size in bytes.
+
+    The size starts from an estimated row size and follows the row
+    sizes measured in the batches read since.
+    """
+
+    def __init__(
+            self,
+            target_bytes: int,
+            row_bytes: int,
+            maximum: int = MAX_ADAPTIVE_BATCH_ROWS,
+         ) -> None:
+        """Class Default Init
+
+        Args:
+            target_bytes: The size batches should be.
+            row_bytes: The estimated size of a row.
+            maximum: The largest batch size in rows.
+        """
+        self.target_bytes = target_bytes
+        self.row_bytes = float(max(row_bytes, 1))
+        self.maximum = maximum
+        self.measured = False
+
+    @property
+    def size(self) -> int:
+        """The number of rows the next batch should have."""
+        return min(max(int(self.target_bytes // self.row_bytes), 1), self.maximum)
+
+    def observe(self, rows: int, size: int) -> None:
+        """Update the row size from a batch.
+
+        The first measurement replaces the estimate, later ones are
+        averaged with it so one unusual batch doesn't swing the size.
+
+        Args:
+            rows: The rows in the batch.
+            size: The measured size of the batch in bytes.
+        """
+        if not rows:
+            return
+        row_bytes = max(size / rows, 1.0)
+        if self.measured:
+            row_bytes = (self.row_bytes + row_bytes) / 2
+        self.row_bytes = row_bytes
+        self.measured = True
+
+
+def prefetch_batches(
+        batches: Iterator[list],
+        max_rows: int,
+        max_bytes: int | None = None,
+     ) -> Iterator[list]:
+    """Read batches on a fetch thread while the caller uses earlier ones.
+
+    The fetch thread stops reading while the batches waiting to be
+    used hold `max_rows` rows or, when given, about `max_bytes` bytes.
+    At least one batch is always let through, so a batch larger than
+    the limits can't stall the pipeline. The iterator is created,
+    drained, and closed on the fetch thread, which suits a connection
+    used by one thread at a time.
+
+    Args:
+        batches: A lazy iterator, such as mssqlConnector.stream_rows().
+        max_rows: The rows held waiting before the fetch thread waits.
+        max_bytes: The approximate bytes held waiting before the fetch
+            thread waits.
+
+    Yields:
+        Each batch from the iterator, in order.
+
+    Raises:
+        Exception: The error raised by the iterator, after the batches
+            read before it.
+    """
+    buffer: deque = deque()
+    condition = threading.Condition()
+    held = {'rows': 0, 'bytes': 0}
+    status: dict[str, Any] = {'stopped': False, 'finished': False, 'error': None}
+
+    def full() -> bool:
+        return bool(buffer) and (
+            held['rows'] >= max_rows
+            or (max_bytes is not None and held['bytes'] >= max_bytes)
+        )
+
+    def fetch() -> None:
+        try:
+            for batch in batches:
+                size = estimate_batch_size(batch) if max_bytes is not None else 0
+                with condition:
+                    while full() and not status['stopped']:
+                        condition.wait()
+                    if status['stopped']:
+                        break
+                    buffer.append((batch, size))
+                    held['rows'] += len(batch)
+                    held['bytes'] += size
+                    condition.notify_all()
+        except Exception as ex:  # noqa: BLE001
+            status['error'] = ex
+        finally:
+            if hasattr(batches, 'close'):
+                batches.close()
+            with condition:
+                status['finished'] = True
+                condition.notify_all()
+
+    thread = threading.Thread(target=fetch, name="tap-mssql-fetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            with condition:
+                while not buffer and not status['finished']:
+                    condition.wait()
+                if not buffer:
+                    if status['error'] is not None:
+                        raise status['error']
+                    return
+                batch, size = buffer.popleft()
+                held['rows'] -= len(batch)
+                held['bytes'] -= size
+                condition.notify_all()
+            yield batch
+    finally:
+        with condition:
+            status['stopped'] = True
+            condition.notify_all()
+        thread.join()
+
+
+class mssqlBulkInspector:
+    """Answers discover_catalog_entry()'s inspector calls from bulk queries.
+
+    The SQLAlchemy inspector runs several queries per table. This
+    reads the columns and keys of every table in the database with
+    two set-based queries and hands them out per table, in the same
+    shape the inspector returns them.
+    """
+
+    # Types SQLAlchemy passes the character length on to
+    length_types = (
+        mssql.VARCHAR,
+        mssql.CHAR,
+        mssql.NVARCHAR,
+        mssql.NCHAR,
+        mssql.TEXT,
+        mssql.NTEXT,
+        mssql.BINARY,
+        mssql.VARBINARY,
+        sqlalchemy.types.LargeBinary,
+    )
+
+    def __init__(self, connection: sqlalchemy.engine.Connection) -> None:
+        """Read the columns and keys of every table.
+
+        Args:
+            connection: An open connection to the database.
+        """
+        self.ischema_names: dict = connection.dialect.ischema_names
+        self.columns: dict[tuple[str, str], list[dict]] = {}
+        self.pk_constraints: dict[tuple[str, str], dict] = {}
+        self.indexes: dict[tuple[str, str], list[dict]] = {}
+
+        column_query = sqlalchemy.text(
+            "SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, DATA_TYPE, IS_NULLABLE, "
+            "CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE, COLLATION_NAME "
+            "FROM INFORMATION_SCHEMA.COLUMNS "
+            "ORDER BY TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION"
+        )
+        for (
+            schema_name,
+            table_name,
+            column_name,
+            data_type,
+            is_nullable,
+            length,
+            precision,
+            scale,
+            collation,
+        ) in connection.execute(column_query):
+            self.columns.setdefault((schema_name, table_name), []).append(
+                {
+                    "name": column_name,
+                    "type": self.build_column_type(
+                        data_type,
+                        length,
+                        precision,
+                        scale,
+                        collation
+                    ),
+                    "nullable": is_nullable == "YES",
+                }
+            )
+
+        key_query = sqlalchemy.text(
+            "SELECT s.name, o.name, i.name, i.is_primary_key, c.name "
+            "FROM sys.indexes AS i "
+            "JOIN sys.objects AS o ON o.object_id = i.object_id "
+            "JOIN sys.schemas AS s ON s.schema_id = o.schema_id "
+            "JOIN sys.index_columns AS ic "
+            "ON ic.object_id = i.object_id AND ic.index_id = i.index_id "
+            "JOIN sys.columns AS c "
+            "ON c.object_id = ic.object_id AND c.column_id = ic.column_id "
+            "WHERE o.type IN ('U', 'V') AND i.is_unique = 1 "
+            "AND i.type != 0 AND ic.is_included_column = 0 "
+            "ORDER BY s.name, o.name, i.index_id, ic.key_ordinal"
+        )
+        for schema_name, table_name, index_name, is_primary_key, column_name in (
+            connection.execute(key_query)
+        ):
+            table_key = (schema_name, table_name)
+            if is_primary_key:
+                pk_constraint = self.pk_constraints.setdefault(
+                    table_key,
+                    {"constrained_columns": [], "name": index_name}
+                )
+                pk_constraint["constrained_columns"].append(column_name)
+                continue
+
+            table_indexes = self.indexes.setdefault(table_key, [])
+            if not table_indexes or table_indexes[-1]["name"] != index_name:
+                table_indexes.append(
+                    {"name": index_name, "unique": True, "column_names": []}
+                )
+            table_indexes[-1]["column_names"].append(column_name)
+
+    def build_column_type(
+            self,
+            data_type: str,
+            length: int | None,
+            precision: int | None,
+            scale: int | None,
+            collation: str | None,
+         ) -> sqlalchemy.types.TypeEngine:
+        """Return the SQLAlchemy type the inspector would reflect.
+
+        Args:
+            data_type: The INFORMATION_SCHEMA.COLUMNS DATA_TYPE.
+            length: The character maximum length, -1 for MAX.
+            precision: The numeric precision.
+            scale: The numeric scale.
+            collation: The collation name.
+
+        Returns:
+            A SQLAlchemy type instance.
+        """
+        column_type = self.ischema_names.get(data_type)
+        if column_type is None:
+            return sqlalchemy.types.NULLTYPE
+
+        kwargs: dict = {}
+        if column_type in self.length_types:
+            kwargs["length"] = None if length == -1 else length
+            if collation:
+                kwargs["collation"] = collation
+
+        if issubclass(column_type, sqlalchemy.types.Numeric):
+            kwargs["precision"] = precision
+            if not issubclass(column_type, sqlalchemy.types.Float):
+                kwargs["scale"] = scale
+
+        return column_type(**kwargs)
+
+    def get_columns(self, table_name: str, schema: str | None = None) -> list[dict]:
+        """Return the columns of a table like Inspector.get_columns()."""
+        return self.columns.get((schema, table_name), [])
+
+    def get_pk_constraint(self, table_name: str, schema: str | None = None) -> dict:
+        """Return the primary key of a table like Inspector.get_pk_constraint()."""
+        return self.pk_constraints.get(
+            (schema, table_name),
+            {"constrained_columns": [], "name": None}
+        )
+
+    def get_indexes(self, table_name: str, schema: str | None = None) -> list[dict]:
+        """Return the unique indexes of a table like Inspector.get_indexes()."""
+        return self.indexes.get((schema, table_name), [])
 
 
 class mssqlConnector(SQLConnector):
@@ -87,7 +1011,376 @@ class mssqlConnector(SQLConnector):
             for key, value in self.config['sqlalchemy_eng_params'].items():
                 eng_config.update({f"{eng_prefix}{key}": value})
 
-        return sqlalchemy.engine_from_config(eng_config, prefix=eng_prefix)
+        engine = sqlalchemy.engine_from_config(eng_config, prefix=eng_prefix)
+
+        session_statements = self.config.get('session_statements')
+        if session_statements:
+            sqlalchemy.event.listen(
+                engine,
+                "connect",
+                build_session_initializer(session_statements)
+            )
+
+        prewarm_connections = self.config.get('prewarm_connections')
+        if prewarm_connections:
+            capacity = pool_capacity(engine.pool)
+            if capacity is not None and prewarm_connections > capacity:
+                self.logger.warning(
+                    "prewarm_connections %s is more than the pool can open, "
+                    "pool_size plus max_overflow, only %s are opened.",
+                    prewarm_connections,
+                    capacity
+                )
+                prewarm_connections = capacity
+            prewarm_pool(engine, prewarm_connections)
+
+        return engine
+
+    def stream_rows(
+            self,
+            query: sqlalchemy.sql.Select,
+            fetch_size: int = DEFAULT_FETCH_SIZE,
+            isolation_level: str | None = None,
+            timings: StreamTimings | None = None,
+            sizer: AdaptiveBatchSize | None = None,
+         ) -> Iterator[list[sqlalchemy.engine.Row]]:
+        """Execute a query and yield its rows in batches.
+
+        The MSSQL dialects do not support server side cursors so
+        `stream_results` alone does not bound memory. Rows are instead
+        pulled from the DBAPI cursor with `fetchmany()` so at most
+        `fetch_size` rows are held in client memory at a time.
+
+        pyodbc output converters in the `output_converters` execution
+        option of the query are registered on the connection for the
+        read and removed again before it goes back to the pool.
+
+        Args:
+            query: The SQLAlchemy selectable to execute.
+            fetch_size: The number of rows fetched per round trip.
+            isolation_level: The transaction isolation level of the read,
+                the connection default when not given.
+            timings: The stream timings the query and fetches are timed in.
+            sizer: Sizes each fetch to a target size in bytes instead of
+                `fetch_size` rows, measured from the rows fetched.
+
+        Yields:
+            Lists of at most `fetch_size` rows, or `sizer.size` rows.
+        """
+        output_converters = query.get_execution_options().get('output_converters', {})
+        with self._connect() as conn:
+            if isolation_level:
+                conn = conn.execution_options(isolation_level=isolation_level)
+            dbapi_connection = conn.connection.dbapi_connection
+            for sql_type, converter in output_converters.items():
+                dbapi_connection.add_output_converter(sql_type, converter)
+            try:
+                with timings.time("query") if timings else nullcontext():
+                    result = conn.execution_options(
+                        stream_results=True,
+                        max_row_buffer=fetch_size
+                    ).execute(query)
+                # Both pyodbc and pymssql cursors honor arraysize
+                if hasattr(result.cursor, 'arraysize'):
+                    result.cursor.arraysize = fetch_size
+                batches = (
+                    result.partitions(fetch_size) if sizer is None
+                    else self.iter_sized_batches(result, sizer)
+                )
+                if timings is None:
+                    yield from batches
+                else:
+                    yield from timings.timed_batches(batches)
+            finally:
+                for sql_type in output_converters:
+                    dbapi_connection.remove_output_converter(sql_type)
+
+    @staticmethod
+    def iter_sized_batches(
+            result: sqlalchemy.engine.CursorResult,
+            sizer: AdaptiveBatchSize,
+         ) -> Iterator[list]:
+        """Fetch a result in batches sized by an AdaptiveBatchSize.
+
+        Args:
+            result: The result to fetch.
+            sizer: The batch size, updated with each batch fetched.
+
+        Yields:
+            Lists of rows.
+        """
+        while True:
+            size = sizer.size
+            if hasattr(result.cursor, 'arraysize'):
+                result.cursor.arraysize = size
+            rows = result.fetchmany(size)
+            if not rows:
+                return
+            sizer.observe(len(rows), estimate_batch_size(rows))
+            yield rows
+
+    def get_column_bounds(
+            self,
+            column: sqlalchemy.Column,
+            where: sqlalchemy.sql.ColumnElement | None = None,
+         ) -> tuple[Any, Any]:
+        """Return the MIN and MAX values of a table column.
+
+        Args:
+            column: A column of a table returned by get_table().
+            where: A predicate the rows must match.
+
+        Returns:
+            A tuple of the min and max value. Both are None for empty tables.
+        """
+        query = sqlalchemy.select(
+            sqlalchemy.func.min(column),
+            sqlalchemy.func.max(column)
+        )
+        if where is not None:
+            query = query.where(where)
+        with self._connect() as conn:
+            return tuple(conn.execute(query).one())
+
+    def get_change_tracking_versions(
+            self,
+            table: sqlalchemy.Table,
+         ) -> tuple[int | None, int | None]:
+        """Return the Change Tracking versions of the database and a table.
+
+        Args:
+            table: A table returned by get_table().
+
+        Returns:
+            A tuple of CHANGE_TRACKING_CURRENT_VERSION() and the
+            CHANGE_TRACKING_MIN_VALID_VERSION() of the table. The min
+            valid version is None when Change Tracking is off for the table.
+        """
+        query = sqlalchemy.select(
+            sqlalchemy.func.CHANGE_TRACKING_CURRENT_VERSION(),
+            sqlalchemy.func.CHANGE_TRACKING_MIN_VALID_VERSION(
+                sqlalchemy.func.OBJECT_ID(
+                    self._dialect.identifier_preparer.format_table(table)
+                )
+            )
+        )
+        with self._connect() as conn:
+            return tuple(conn.execute(query).one())
+
+    def get_cdc_lsn_range(
+            self,
+            capture_instance: str,
+         ) -> tuple[bytes | None, bytes | None]:
+        """Return the LSN range CDC holds changes for.
+
+        Args:
+            capture_instance: The name of the CDC capture instance.
+
+        Returns:
+            A tuple of the min LSN of the capture instance and the max
+            LSN of the database. The min LSN is None when the capture
+            instance does not exist.
+        """
+        query = sqlalchemy.select(
+            sqlalchemy.func.sys.fn_cdc_get_min_lsn(capture_instance),
+            sqlalchemy.func.sys.fn_cdc_get_max_lsn()
+        )
+        with self._connect() as conn:
+            min_lsn, max_lsn = conn.execute(query).one()
+        if min_lsn is not None and not any(min_lsn):
+            # fn_cdc_get_min_lsn() returns zeros for an unknown capture instance
+            min_lsn = None
+        return min_lsn, max_lsn
+
+    def get_object_modify_dates(self) -> dict[str, dict[str, tuple[bool, str]]]:
+        """Return when each table and view was last changed.
+
+        The objects are the ones INFORMATION_SCHEMA.TABLES lists, which
+        is what the SQLAlchemy inspector discovers, with the
+        `modify_date` from sys.objects.
+
+        Returns:
+            A dict of schema names to a dict of object names to a tuple
+            of is_view and the modify date in ISO format.
+        """
+        query = sqlalchemy.text(
+            "SELECT t.TABLE_SCHEMA, t.TABLE_NAME, t.TABLE_TYPE, o.modify_date "
+            "FROM INFORMATION_SCHEMA.TABLES AS t "
+            "JOIN sys.objects AS o ON o.object_id = OBJECT_ID("
+            "QUOTENAME(t.TABLE_SCHEMA) + '.' + QUOTENAME(t.TABLE_NAME))"
+        )
+        modify_dates: dict[str, dict[str, tuple[bool, str]]] = {}
+        with self._connect() as conn:
+            for schema_name, table_name, table_type, modify_date in conn.execute(query):
+                modify_dates.setdefault(schema_name, {})[table_name] = (
+                    table_type == 'VIEW',
+                    modify_date.isoformat()
+                )
+        return modify_dates
+
+    def get_discovery_cache_path(self, schema_name: str) -> Path:
+        """Return the discovery cache file for a schema.
+
+        Args:
+            schema_name: The schema the cache file holds.
+
+        Returns:
+            The path of the cache file in `discovery_cache_dir`.
+        """
+        cache_key = "-".join(
+            str(part) for part in (
+                self.config.get('host'),
+                self.config.get('port', ''),
+                self.config.get('database'),
+                schema_name
+            )
+        )
+        cache_key = re.sub(r"[^A-Za-z0-9_.-]", "_", cache_key)
+        return Path(self.config['discovery_cache_dir']) / f"{cache_key}.json"
+
+    def read_discovery_cache(self, schema_name: str) -> dict:
+        """Return the cached tables of a schema.
+
+        A cache written with a different `hd_jsonschema_types` setting
+        holds different schemas so it is ignored.
+
+        Args:
+            schema_name: The schema to read.
+
+        Returns:
+            A dict of table names to their modify date and catalog entry.
+        """
+        cache_path = self.get_discovery_cache_path(schema_name)
+        try:
+            cache = json.loads(cache_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+        if cache.get('hd_jsonschema_types') != self.config.get('hd_jsonschema_types', False):
+            return {}
+
+        return cache.get('tables', {})
+
+    def write_discovery_cache(self, schema_name: str, tables: dict) -> None:
+        """Write the tables of a schema to the discovery cache.
+
+        Args:
+            schema_name: The schema to write.
+            tables: A dict of table names to their modify date and catalog entry.
+        """
+        cache_path = self.get_discovery_cache_path(schema_name)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_suffix('.tmp')
+        temp_path.write_text(
+            json.dumps(
+                {
+                    'hd_jsonschema_types': self.config.get('hd_jsonschema_types', False),
+                    'tables': tables
+                }
+            )
+        )
+        os.replace(temp_path, cache_path)
+
+    def get_table_columns(
+            self,
+            full_table_name: str,
+            column_names: list[str] | None = None,
+         ) -> dict[str, sqlalchemy.Column]:
+        """Return a list of table columns.
+
+        ROWVERSION (TIMESTAMP) columns are given the RowVersion type so
+        they are read as integers.
+
+        Args:
+            full_table_name: Fully qualified table name.
+            column_names: A list of column names to filter to.
+
+        Returns:
+            An ordered dict of column names to column objects.
+        """
+        columns = super().get_table_columns(full_table_name, column_names)
+        for name, column in columns.items():
+            if isinstance(column.type, mssql.TIMESTAMP):
+                columns[name] = sqlalchemy.Column(
+                    name,
+                    RowVersion(),
+                    nullable=column.nullable
+                )
+        return columns
+
+    def get_inspector(self) -> sqlalchemy.engine.Inspector | mssqlBulkInspector:
+        """Return the inspector discovery reads columns and keys from.
+
+        Returns:
+            A mssqlBulkInspector when `bulk_discovery` is on,
+            otherwise a SQLAlchemy inspector.
+        """
+        if self.config.get('bulk_discovery', False):
+            with self._connect() as conn:
+                return mssqlBulkInspector(conn)
+
+        return sqlalchemy.inspect(self._engine)
+
+    def discover_catalog_entries(self) -> list[dict]:
+        """Return a list of catalog entries from discovery.
+
+        When `bulk_discovery` is on, the columns and keys of every table
+        are read with a few set-based queries instead of several
+        inspector queries per table.
+
+        When `discovery_cache_dir` is set, catalog entries are kept on
+        disk per server, database, and schema. Only tables and views
+        whose sys.objects `modify_date` changed since they were cached
+        are reflected again.
+
+        Returns:
+            The discovered catalog entries as a list.
+        """
+        use_cache = bool(self.config.get('discovery_cache_dir'))
+        if not use_cache and not self.config.get('bulk_discovery', False):
+            return super().discover_catalog_entries()
+
+        result: list[dict] = []
+        engine = self._engine
+        inspected = None
+        for schema_name, objects in self.get_object_modify_dates().items():
+            cached_tables = self.read_discovery_cache(schema_name) if use_cache else {}
+            tables: dict = {}
+            reflected = 0
+            for table_name, (is_view, modify_date) in objects.items():
+                cached_table = cached_tables.get(table_name)
+                if not cached_table or cached_table['modify_date'] != modify_date:
+                    # Only inspect the database if something changed
+                    if inspected is None:
+                        inspected = self.get_inspector()
+                    cached_table = {
+                        'modify_date': modify_date,
+                        'catalog_entry': self.discover_catalog_entry(
+                            engine,
+                            inspected,
+                            schema_name,
+                            table_name,
+                            is_view,
+                        ).to_dict()
+                    }
+                    reflected += 1
+                tables[table_name] = cached_table
+                result.append(cached_table['catalog_entry'])
+
+            if not use_cache:
+                continue
+
+            self.logger.info(
+                f"Discovery cache for schema '{schema_name}': "
+                f"{len(tables) - reflected} cached, {reflected} reflected."
+            )
+            if reflected or len(tables) != len(cached_tables):
+                self.write_discovery_cache(schema_name, tables)
+
+        return result
+
+    # Shared by all connectors, keyed on hd_jsonschema_types and the type signature
+    jsonschema_type_cache: dict[tuple, dict] = {}
 
     def to_jsonschema_type(
             self,
@@ -99,6 +1392,9 @@ class mssqlConnector(SQLConnector):
         Developers may optionally add custom logic before calling the default
         implementation inherited from the base class.
 
+        Each distinct type signature (type, length, precision, scale) is
+        only mapped once per process.
+
         Args:
             from_type: The SQL type as a string or as a TypeEngine.
                 If a TypeEngine is provided, it may be provided as a class or
@@ -107,10 +1403,27 @@ class mssqlConnector(SQLConnector):
         Returns:
             A compatible JSON Schema type definition.
         """
-        if self.config.get('hd_jsonschema_types', False):
-            return self.hd_to_jsonschema_type(from_type)
-        else:
-            return self.org_to_jsonschema_type(from_type)
+        hd_jsonschema_types = self.config.get('hd_jsonschema_types', False)
+        cache_key = (hd_jsonschema_types, *jsonschema_type_signature(from_type))
+        jsonschema_type = self.jsonschema_type_cache.get(cache_key)
+
+        if jsonschema_type is None:
+            if hd_jsonschema_types:
+                jsonschema_type = self.hd_to_jsonschema_type(from_type)
+            else:
+                jsonschema_type = self.org_to_jsonschema_type(from_type)
+
+            if len(self.jsonschema_type_cache) >= JSONSCHEMA_TYPE_CACHE_SIZE:
+                # Drop the oldest entry to keep the cache bounded
+                self.jsonschema_type_cache.pop(
+                    next(iter(self.jsonschema_type_cache)),
+                    None
+                )
+            self.jsonschema_type_cache[cache_key] = jsonschema_type
+
+        # Callers get their own deep copy, the schema's type list is
+        # changed in place when a column is made nullable
+        return copy.deepcopy(jsonschema_type)
 
     @staticmethod
     def org_to_jsonschema_type(
@@ -137,19 +1450,25 @@ class mssqlConnector(SQLConnector):
                 if scale = 0 it is typed as a INTEGER
                 if scale != 0 it is typed as NUMBER
         """
-        if str(from_type).startswith("NUMERIC"):
-            if str(from_type).endswith(", 0)"):
+        type_string = str(from_type)
+
+        if type_string.startswith("NUMERIC"):
+            if type_string.endswith(", 0)"):
                 from_type = "int"
             else:
                 from_type = "number"
 
-        if str(from_type) in ["MONEY", "SMALLMONEY"]:
+        if type_string in ["MONEY", "SMALLMONEY"]:
             from_type = "number"
 
+        # ROWVERSION is an 8 byte counter read by RowVersion as an integer
+        if type_string in ["TIMESTAMP", "ROWVERSION"]:
+            from_type = "int"
+
         # This is a MSSQL only DataType
         # SQLA does the converion from 0,1
         # to Python True, False
-        if str(from_type) in ['BIT']:
+        if type_string in ['BIT']:
             from_type = "bool"
         
         return SQLConnector.to_jsonschema_type(from_type)
@@ -238,6 +1557,14 @@ class mssqlConnector(SQLConnector):
         if sql_type_name == 'BIT':
             return {"type": ["boolean"]}
 
+        # ROWVERSION is an 8 byte counter read by RowVersion as an integer
+        if sql_type_name in ['TIMESTAMP', 'ROWVERSION']:
+            return {
+                "type": ["integer"],
+                "minimum": 0,
+                "maximum": 18446744073709551615
+            }
+
         # This is a MSSQL only DataType
         if sql_type_name == 'TINYINT':
             return {
@@ -389,10 +1716,315 @@ class CustomJSONEncoder(json.JSONEncoder):
         # Default behavior for all other types
         return super().default(obj)
 
-class JSONLinesBatcher(BaseBatcher):
-    """JSON Lines Record Batcher."""
+def write_batch_file(
+        storage: StorageTarget,
+        filename: str,
+        records: list[dict],
+        serializer: JSONSerializer,
+        compresslevel: int = 9,
+        filesystem: FS | None = None,
+        timings: StreamTimings | None = None,
+     ) -> str:
+    """Write records to a gzipped JSON Lines batch file.
+
+    This is a module level function so it can be handed to a process pool.
+
+    Args:
+        storage: The storage target of the batch file.
+        filename: The name of the batch file.
+        records: The records to write.
+        serializer: The serializer that encodes the records.
+        compresslevel: The gzip compression level from 0 to 9.
+        filesystem: An open filesystem of the storage target. One is
+            opened for the file when not given.
+        timings: The stream timings to add the encoding, compression,
+            and write time to.
+
+    Returns:
+        The URL of the written file.
+    """
+    if filesystem is None:
+        with storage.fs(create=True) as filesystem:
+            return write_batch_file(
+                storage,
+                filename,
+                records,
+                serializer,
+                compresslevel,
+                filesystem,
+                timings
+            )
 
-    encoder_class = CustomJSONEncoder
+    start = time.perf_counter()
+    data = serializer.encode_lines(records)
+    encoded = time.perf_counter()
+    data = gzip.compress(data, compresslevel=compresslevel)
+    compressed = time.perf_counter()
+    with filesystem.open(filename, "wb") as f:
+        f.write(data)
+    if timings is not None:
+        timings.add("serialize", encoded - start)
+        timings.add("compress", compressed - encoded)
+        timings.add("write", time.perf_counter() - compressed, size=len(data))
+    return filesystem.geturl(filename)
+
+
+def to_arrow_type(sql_type: sqlalchemy.types.TypeEngine) -> pyarrow.DataType:
+    """Return the Arrow type that keeps the values of a SQL type intact.
+
+    Args:
+        sql_type: The SQLAlchemy type of a column.
+
+    Returns:
+        An Arrow data type. Types with no closer match are strings.
+    """
+    sql_type_name = type(sql_type).__name__
+
+    if isinstance(sql_type, RowVersion):
+        return pyarrow.uint64()
+
+    if isinstance(sql_type, sqlalchemy.types._Binary):
+        # Includes TIMESTAMP which is a ROWVERSION in MSSQL
+        return pyarrow.binary()
+
+    if isinstance(sql_type, sqlalchemy.types.Boolean):
+        return pyarrow.bool_()
+
+    if isinstance(sql_type, sqlalchemy.types.Integer):
+        return {
+            'TINYINT': pyarrow.uint8(),
+            'SMALLINT': pyarrow.int16(),
+            'INTEGER': pyarrow.int32(),
+        }.get(sql_type_name, pyarrow.int64())
+
+    if sql_type_name == 'MONEY':
+        return pyarrow.decimal128(19, 4)
+
+    if sql_type_name == 'SMALLMONEY':
+        return pyarrow.decimal128(10, 4)
+
+    if isinstance(sql_type, sqlalchemy.types.Float):
+        if sql_type_name == 'REAL':
+            return pyarrow.float32()
+        return pyarrow.float64()
+
+    if isinstance(sql_type, sqlalchemy.types.Numeric):
+        if sql_type.precision:
+            return pyarrow.decimal128(sql_type.precision, sql_type.scale or 0)
+        return pyarrow.string()
+
+    if sql_type_name == 'DATETIMEOFFSET':
+        return pyarrow.timestamp('us', tz='UTC')
+
+    if isinstance(sql_type, sqlalchemy.types.DateTime):
+        return pyarrow.timestamp('us')
+
+    if isinstance(sql_type, sqlalchemy.types.Date):
+        return pyarrow.date32()
+
+    if isinstance(sql_type, sqlalchemy.types.Time):
+        return pyarrow.time64('us')
+
+    return pyarrow.string()
+
+
+def build_arrow_schema(
+        columns: Iterable[sqlalchemy.Column],
+        schema: dict | None = None,
+     ) -> pyarrow.Schema:
+    """Return the Arrow schema for a stream's selected columns.
+
+    Table columns are typed by their SQL type. Properties of the stream
+    schema that are not table columns, such as `_sdc_deleted_at`, are
+    typed by the SQL type of their JSON schema.
+
+    Args:
+        columns: The columns of the table returned by get_table().
+        schema: The stream's selected JSON schema. Its properties are
+            the fields, in order. The columns are when not given.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+
+    Returns:
+        An Arrow schema with one field per column.
+    """
+    if pyarrow is None:
+        raise ImportError(
+            "Parquet and Arrow batch files need pyarrow: "
+            "pip install 'tap-mssql[parquet]'"
+        )
+
+    if schema is None:
+        return pyarrow.schema(
+            [
+                pyarrow.field(column.name, to_arrow_type(column.type), column.nullable)
+                for column in columns
+            ]
+        )
+
+    table_columns = {column.name: column for column in columns}
+    fields = []
+    for name, property_schema in schema['properties'].items():
+        types = property_schema.get('type') or []
+        # Deleted rows of Change Tracking and CDC streams only have keys
+        nullable = 'null' in types
+        column = table_columns.get(name)
+        if column is None:
+            arrow_type = to_arrow_type(mssqlConnector.to_sql_type(property_schema))
+        else:
+            arrow_type = to_arrow_type(column.type)
+            nullable = nullable or bool(column.nullable)
+        fields.append(pyarrow.field(name, arrow_type, nullable))
+    return pyarrow.schema(fields)
+
+
+def write_arrow_file(
+        storage: StorageTarget,
+        filename: str,
+        records: list[dict],
+        arrow_schema: pyarrow.Schema,
+        file_format: str = "parquet",
+        compression: str | None = None,
+        filesystem: FS | None = None,
+     ) -> str:
+    """Write records to a Parquet or Arrow IPC batch file.
+
+    The records are turned into one Arrow array per column. String
+    columns holding other types, such as uniqueidentifier, are
+    converted with str().
+
+    Args:
+        storage: The storage target of the batch file.
+        filename: The name of the batch file.
+        records: The records to write.
+        arrow_schema: The Arrow schema of the records.
+        file_format: Either parquet or arrow.
+        compression: The codec, defaults to snappy for parquet and none for arrow.
+        filesystem: An open filesystem of the storage target. One is
+            opened for the file when not given.
+
+    Returns:
+        The URL of the written file.
+    """
+    if filesystem is None:
+        with storage.fs(create=True) as filesystem:
+            return write_arrow_file(
+                storage,
+                filename,
+                records,
+                arrow_schema,
+                file_format,
+                compression,
+                filesystem
+            )
+
+    if compression == "none":
+        compression = None
+
+    arrays = []
+    for field in arrow_schema:
+        values = [record.get(field.name) for record in records]
+        try:
+            arrays.append(pyarrow.array(values, type=field.type))
+        except (pyarrow.ArrowTypeError, pyarrow.ArrowInvalid):
+            if not pyarrow.types.is_string(field.type):
+                raise
+            arrays.append(
+                pyarrow.array(
+                    [None if value is None else str(value) for value in values],
+                    type=field.type
+                )
+            )
+    table = pyarrow.Table.from_arrays(arrays, schema=arrow_schema)
+
+    with filesystem.open(filename, "wb") as f:
+        if file_format == "arrow":
+            with pyarrow.ipc.new_file(
+                f,
+                arrow_schema,
+                options=pyarrow.ipc.IpcWriteOptions(compression=compression)
+            ) as writer:
+                writer.write_table(table)
+        else:
+            pyarrow.parquet.write_table(
+                table,
+                f,
+                compression=compression or "snappy"
+            )
+    return filesystem.geturl(filename)
+
+
+class FileBatcher(BaseBatcher):
+    """Base for batchers that write each chunk of records to a file."""
+
+    file_extension: str = "OVERRIDE_ME"
+    write_file: Callable[..., str]
+
+    def __init__(
+        self,
+        tap_name: str,
+        stream_name: str,
+        batch_config: BatchConfig,
+        workers: int = 0,
+        worker_type: str = "thread",
+        compresslevel: int = 9,
+        sizer: AdaptiveBatchSize | None = None,
+    ) -> None:
+        """Initialize the batcher.
+
+        Args:
+            tap_name: The name of the tap.
+            stream_name: The name of the stream.
+            batch_config: The batch configuration.
+            workers: The number of workers encoding and compressing
+                batch files. With 0 files are written on the calling thread.
+            worker_type: Whether the workers are threads or processes.
+            compresslevel: The gzip compression level from 0 to 9.
+            sizer: Sizes each file to a target size in bytes instead of
+                `batch_size` records.
+        """
+        super().__init__(tap_name, stream_name, batch_config)
+        self.workers = workers
+        self.worker_type = worker_type
+        self.compresslevel = compresslevel
+        self.sizer = sizer
+
+    @property
+    def write_options(self) -> dict:
+        """Keyword arguments write_file() is called with for each chunk."""
+        return {}
+
+    def measure_chunk(self, chunk: list[dict]) -> int:
+        """Return the approximate memory size of a chunk of records in bytes."""
+        sample = [list(record.values()) for record in (chunk[0], chunk[-1])]
+        return estimate_batch_size(sample) * len(chunk) // len(sample)
+
+    def iter_chunks(self, records: Iterator[dict]) -> Iterator[list[dict]]:
+        """Split records into the chunks written to each batch file.
+
+        Chunks are `batch_size` records, or `sizer.size` records when
+        the batcher has a sizer. The sizer is updated with each chunk
+        before the next one is read.
+
+        Args:
+            records: The records to batch.
+
+        Yields:
+            Lists of records.
+        """
+        if self.sizer is None:
+            for chunk in lazy_chunked_generator(records, self.batch_config.batch_size):
+                yield list(chunk)
+            return
+
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, self.sizer.size))
+            if not chunk:
+                return
+            self.sizer.observe(len(chunk), self.measure_chunk(chunk))
+            yield chunk
 
     def get_batches(
         self,
@@ -400,6 +2032,11 @@ class JSONLinesBatcher(BaseBatcher):
     ) -> Iterator[list[str]]:
         """Yield manifest of batches.
 
+        With workers, finished chunks are encoded, compressed, and
+        written on a pool while the next chunk is read. At most two
+        chunks per worker are in flight and manifests are yielded in
+        chunk order.
+
         Args:
             records: The records to batch.
 
@@ -408,84 +2045,1361 @@ class JSONLinesBatcher(BaseBatcher):
         """
         sync_id = f"{self.tap_name}--{self.stream_name}-{uuid4()}"
         prefix = self.batch_config.storage.prefix or ""
-
-        for i, chunk in enumerate(
-            lazy_chunked_generator(
-                records,
-                self.batch_config.batch_size,
-            ),
-            start=1,
-        ):
-            filename = f"{prefix}{sync_id}-{i}.json.gz"
-            with self.batch_config.storage.fs(create=True) as fs:
-                # TODO: Determine compression from config.
-                with fs.open(filename, "wb") as f, gzip.GzipFile(
-                    fileobj=f,
-                    mode="wb",
-                ) as gz:
-                    gz.writelines(
-                        (json.dumps(record, cls=self.encoder_class, default=str) + "\n").encode()
-                        for record in chunk
+        storage = self.batch_config.storage
+
+        chunks = enumerate(self.iter_chunks(records), start=1)
+
+        if not self.workers:
+            with storage.fs(create=True) as fs:
+                for i, chunk in chunks:
+                    yield [
+                        self.write_file(
+                            storage,
+                            f"{prefix}{sync_id}-{i}.{self.file_extension}",
+                            chunk,
+                            filesystem=fs,
+                            **self.write_options
+                        )
+                    ]
+            return
+
+        if self.worker_type == "process":
+            executor = ProcessPoolExecutor(max_workers=self.workers)
+            fs = None
+        else:
+            executor = ThreadPoolExecutor(max_workers=self.workers)
+            fs = storage.fs(create=True)
+
+        pending: deque = deque()
+        with executor, fs or nullcontext() as filesystem:
+            for i, chunk in chunks:
+                pending.append(
+                    executor.submit(
+                        self.write_file,
+                        storage,
+                        f"{prefix}{sync_id}-{i}.{self.file_extension}",
+                        chunk,
+                        filesystem=filesystem,
+                        **self.write_options
                     )
-                file_url = fs.geturl(filename)
-            yield [file_url]
+                )
+                if len(pending) >= self.workers * 2:
+                    yield [pending.popleft().result()]
 
+            while pending:
+                yield [pending.popleft().result()]
 
-class mssqlStream(SQLStream):
-    """Stream class for mssql streams."""
 
-    connector_class = mssqlConnector
+class JSONLinesBatcher(FileBatcher):
+    """JSON Lines Record Batcher."""
 
-    def post_process(
+    encoder_class = CustomJSONEncoder
+    file_extension = "json.gz"
+    write_file = staticmethod(write_batch_file)
+
+    def __init__(
         self,
-        row: dict,
-        context: dict | None = None,  # noqa: ARG002
-    ) -> dict | None:
-        """As needed, append or transform raw data to match expected structure.
+        tap_name: str,
+        stream_name: str,
+        batch_config: BatchConfig,
+        serializer: JSONSerializer | None = None,
+        timings: StreamTimings | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the batcher.
 
-        Optional. This method gives developers an opportunity to "clean up" the results
-        prior to returning records to the downstream tap - for instance: cleaning,
-        renaming, or appending properties to the raw record result returned from the
-        API.
+        Args:
+            tap_name: The name of the tap.
+            stream_name: The name of the stream.
+            batch_config: The batch configuration.
+            serializer: The serializer that encodes the records, the
+                standard library one with encoder_class when not given.
+            timings: The stream timings batch files are timed in. Files
+                written by process workers are not timed.
+            kwargs: Worker options passed to FileBatcher.
+        """
+        super().__init__(tap_name, stream_name, batch_config, **kwargs)
+        self.serializer = serializer or JSONSerializer(self.encoder_class)
+        self.timings = timings if self.worker_type != "process" else None
+
+    @property
+    def write_options(self) -> dict:
+        """Keyword arguments write_file() is called with for each chunk."""
+        return {
+            'serializer': self.serializer,
+            'compresslevel': self.compresslevel,
+            'timings': self.timings,
+        }
 
-        Developers may also return `None` from this method to filter out
-        invalid or not-applicable records from the stream.
+    def measure_chunk(self, chunk: list[dict]) -> int:
+        """Return the approximate JSON Lines size of a chunk of records in bytes."""
+        sample = [chunk[0], chunk[-1]]
+        return len(self.serializer.encode_lines(sample)) * len(chunk) // len(sample)
 
-        Args:
-            row: Individual record in the stream.
-            context: Stream partition or context dictionary.
 
-        Returns:
-            The resulting record dict, or `None` if the record should be excluded.
+class ArrowBatcher(FileBatcher):
+    """Parquet and Arrow IPC Record Batcher.
+
+    Records must hold the values the driver returned, not the strings
+    post_process() makes for JSON, so the Arrow types keep their fidelity.
+    """
+
+    write_file = staticmethod(write_arrow_file)
+
+    def __init__(
+        self,
+        tap_name: str,
+        stream_name: str,
+        batch_config: BatchConfig,
+        arrow_schema: pyarrow.Schema,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the batcher.
+
+        Args:
+            tap_name: The name of the tap.
+            stream_name: The name of the stream.
+            batch_config: The batch configuration.
+            arrow_schema: The Arrow schema of the records.
+            kwargs: The FileBatcher worker options.
+        """
+        super().__init__(tap_name, stream_name, batch_config, **kwargs)
+        self.arrow_schema = arrow_schema
+        self.file_extension = batch_config.encoding.format
+
+    @property
+    def write_options(self) -> dict:
+        """Keyword arguments write_file() is called with for each chunk."""
+        return {
+            'arrow_schema': self.arrow_schema,
+            'file_format': self.batch_config.encoding.format,
+            'compression': self.batch_config.encoding.compression,
+        }
+
+
+class mssqlStream(SQLStream):
+    """Stream class for mssql streams."""
+
+    connector_class = mssqlConnector
+
+    # Set by Tapmssql.sync_streams() when streams are synced concurrently
+    sync_lock: threading.Lock | None = None
+
+    _row_converters: list[tuple[str, Callable]] | None = None
+    _serializer: JSONSerializer | None = None
+    _timings: StreamTimings | None = None
+    _fetch_sizer: AdaptiveBatchSize | None = None
+    # The primary keys bookmarked while a resumable full table read runs
+    _bookmark_keys: list[str] | None = None
+
+    @property
+    def timings(self) -> StreamTimings | None:
+        """Where the stream's sync spends its time.
+
+        Returns:
+            The stream's timings when `stream_metrics` or `metrics_file`
+            is set, otherwise None.
+        """
+        if self._timings is None and (
+            self.config.get('stream_metrics') or self.config.get('metrics_file')
+        ):
+            self._timings = StreamTimings(self.name)
+        return self._timings
+
+    @property
+    def fetch_sizer(self) -> AdaptiveBatchSize | None:
+        """The size of each fetch when `fetch_target_bytes` is set.
+
+        Returns:
+            An AdaptiveBatchSize starting from the row size estimated
+            from the stream's schema, or None to fetch `fetch_size` rows.
+        """
+        target_bytes = self.config.get('fetch_target_bytes')
+        if self._fetch_sizer is None and target_bytes:
+            self._fetch_sizer = AdaptiveBatchSize(
+                target_bytes,
+                estimate_record_size(self.get_selected_schema())
+            )
+        return self._fetch_sizer
+
+    @contextmanager
+    def instrumented(self) -> Iterator[None]:
+        """Profile and time the block when configured.
+
+        With `profiler` set a profile of the block is written to
+        `profile_dir`. The stream's timings end with the block.
+
+        Yields:
+            None
+        """
+        timings = self.timings
+        with profile(
+            self.config.get('profiler'),
+            self.config.get('profile_dir') or 'profiles',
+            self.name
+        ):
+            yield
+        if timings is not None:
+            timings.finish()
+
+    def _sync_records(
+            self,
+            context: dict | None = None,
+            *,
+            write_messages: bool = True,
+         ) -> Iterator[dict]:
+        """Sync records, profiled and timed when configured.
+
+        Batched streams are instrumented by _sync_batches() instead,
+        which also covers writing the batch files.
+
+        Args:
+            context: Stream partition or context dictionary.
+            write_messages: Whether to write Singer messages to stdout.
+
+        Yields:
+            Each record synced.
+        """
+        if not write_messages:
+            yield from super()._sync_records(context, write_messages=False)
+            return
+
+        with self.instrumented():
+            yield from super()._sync_records(context)
+
+    def _sync_batches(
+            self,
+            batch_config: BatchConfig,
+            context: dict | None = None,
+         ) -> None:
+        """Sync batches, profiled and timed when configured.
+
+        Args:
+            batch_config: The batch configuration.
+            context: Stream partition or context dictionary.
+        """
+        with self.instrumented():
+            super()._sync_batches(batch_config, context=context)
+
+    def log_sync_costs(self) -> None:
+        """Log the sync costs and the stream's timings as METRIC lines.
+
+        Every stream's costs are logged after all streams are synced,
+        so the last stream also writes `metrics_file` for the tap, and
+        warns when `max_concurrent_streams` was not used.
+        """
+        super().log_sync_costs()
+        if self.timings is not None and self.timings.elapsed is not None:
+            self.timings.log()
+
+        streams = list(self._tap.streams.values())
+        if not streams or streams[-1] is not self:
+            return
+
+        if self.config.get('max_concurrent_streams', 1) > 1 and self.sync_lock is None:
+            self.logger.warning(
+                "Streams were synced one at a time, max_concurrent_streams "
+                "is only used by the tap-mssql command and "
+                "Tapmssql.sync_streams(), not Tap.sync_all()."
+            )
+        if self.config.get('metrics_file'):
+            write_metrics_file(
+                self.config['metrics_file'],
+                [
+                    stream.timings for stream in streams
+                    if stream.selected and stream.timings is not None
+                ],
+                self.config.get('metrics_file_format', 'json')
+            )
+
+    @property
+    def serializer(self) -> JSONSerializer:
+        """The serializer for RECORD messages and JSON Lines batch files.
+
+        Returns:
+            The serializer named by the `json_serializer` setting.
+        """
+        if self._serializer is None:
+            self._serializer = get_serializer(
+                self.config.get('json_serializer', 'auto'),
+                JSONLinesBatcher.encoder_class
+            )
+            if (
+                isinstance(self._serializer, OrjsonSerializer)
+                and not hasattr(orjson, 'Fragment')
+            ):
+                self.logger.warning(
+                    "orjson %s has no Fragment, messages with Decimals "
+                    "fall back to the json serializer. Install orjson 3.9 "
+                    "or later.",
+                    orjson.__version__
+                )
+        return self._serializer
+
+    @property
+    def row_converters(self) -> list[tuple[str, Callable]]:
+        """The converters post_process() applies, built once per stream.
+
+        Returns:
+            A list of column names paired with their converter.
+        """
+        if self._row_converters is None:
+            batch_config = self.get_batch_config(self.config)
+            if batch_config and batch_config.encoding.format in ARROW_BATCH_FORMATS:
+                # Arrow batch files keep the values as the driver returns them
+                self._row_converters = []
+            else:
+                self._row_converters = build_row_converters(
+                    self.get_selected_schema()
+                )
+        return self._row_converters
+
+    @property
+    def native_type_conversion(self) -> bool:
+        """Whether values are converted by SQL Server and the driver.
+
+        Only used with JSON records that post_process() is not
+        overridden for, Arrow batch files keep the driver's values.
+
+        Returns:
+            True when `native_type_conversion` is on and can be used.
+        """
+        if not self.config.get('native_type_conversion'):
+            return False
+        batch_config = self.get_batch_config(self.config)
+        if batch_config and batch_config.encoding.format in ARROW_BATCH_FORMATS:
+            return False
+        return type(self).post_process is mssqlStream.post_process
+
+    @property
+    def lob_policies(self) -> dict[str, dict]:
+        """The `lob_policies` set for the stream's columns.
+
+        Policies for the replication key and primary keys are ignored.
+
+        Returns:
+            A dict of column names and their policy settings.
+        """
+        key_names = {self.replication_key, *(self.primary_keys or [])}
+        return {
+            policy['column']: policy
+            for policy in self.config.get('lob_policies') or []
+            if policy.get('table') == self.tap_stream_id
+            and policy.get('column') not in key_names
+        }
+
+    def apply_lob_policies(
+            self,
+            query: sqlalchemy.sql.Select,
+            table: sqlalchemy.Table,
+         ) -> tuple[sqlalchemy.sql.Select, dict[str, str]]:
+        """Select the LOB columns of a query by their policy.
+
+        Skipped columns are not in the table at all. Truncated columns
+        are selected with SUBSTRING(), hashed columns as the hex
+        SHA2_256 HASHBYTES() of the value, and file columns as their
+        DATALENGTH() for write_lob_files() to replace.
+
+        Args:
+            query: The query selecting the table's columns.
+            table: The table the query reads.
+
+        Returns:
+            The query and the policies applied to its columns. File
+            columns of streams without a primary key are hashed.
+        """
+        policies = self.lob_policies
+        columns = []
+        applied: dict[str, str] = {}
+        for name, expression in query.selected_columns.items():
+            policy = policies.get(name, {}).get('policy')
+            if policy is None or policy == 'skip' or name not in table.columns:
+                columns.append(expression)
+                continue
+
+            source = lob_source(expression, table.columns[name].type)
+            if policy == 'file' and not self.primary_keys:
+                self.logger.warning(
+                    "Stream '%s' has no primary key to read '%s' into a file by, "
+                    "it is hashed instead.",
+                    self.name,
+                    name
+                )
+                policy = 'hash'
+
+            if policy == 'truncate':
+                expression = sqlalchemy.func.SUBSTRING(
+                    source, 1, policies[name].get('max_length') or LOB_CHUNK_SIZE
+                )
+            elif policy == 'hash':
+                expression = sqlalchemy.func.LOWER(
+                    sql_convert(
+                        sqlalchemy.func.HASHBYTES(
+                            sqlalchemy.literal_column("'SHA2_256'"),
+                            source
+                        ),
+                        'CHAR(64)',
+                        2
+                    ),
+                    type_=sqlalchemy.String()
+                )
+            else:
+                expression = sqlalchemy.func.DATALENGTH(source)
+            columns.append(expression.label(name))
+            applied[name] = policy
+
+        if not applied:
+            return query, applied
+        return query.with_only_columns(*columns), applied
+
+    def write_lob_files(
+            self,
+            batches: Iterable[list],
+            table: sqlalchemy.Table,
+            column_names: list[str],
+            file_columns: set[str],
+         ) -> Iterator[list]:
+        """Write the values of file policy columns to files.
+
+        Values are read LOB_CHUNK_SIZE at a time by primary key, so a
+        large value is never held in memory, and written to a file in
+        `lob_dir`. The DATALENGTH() selected for the column is replaced
+        with the path of the file.
+
+        Args:
+            batches: Batches of rows from a query apply_lob_policies() changed.
+            table: The table the rows are read from.
+            column_names: The names of the columns in each row.
+            file_columns: The file policy columns.
+
+        Yields:
+            Batches of rows with file paths in the file columns.
+        """
+        key_columns = [table.columns[key] for key in self.primary_keys]
+        key_indexes = [column_names.index(key) for key in self.primary_keys]
+        file_indexes = [
+            (column_names.index(name), table.columns[name])
+            for name in sorted(file_columns)
+        ]
+        directory = Path(self.config.get('lob_dir') or 'lobs', self.tap_stream_id)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        for rows in batches:
+            file_rows = []
+            with self.connector._connect() as conn:
+                for row in rows:
+                    values = list(row)
+                    key_clause = [
+                        column == values[index]
+                        for column, index in zip(key_columns, key_indexes)
+                    ]
+                    for index, column in file_indexes:
+                        if values[index] is not None:
+                            values[index] = self.write_lob_file(
+                                conn, column, key_clause, directory
+                            )
+                    file_rows.append(values)
+            yield file_rows
+
+    @staticmethod
+    def write_lob_file(
+            conn: sqlalchemy.engine.Connection,
+            column: sqlalchemy.Column,
+            key_clause: list,
+            directory: Path,
+         ) -> str:
+        """Write one LOB value to a file in chunks.
+
+        Args:
+            conn: The connection to read the value on.
+            column: The LOB column.
+            key_clause: The primary key conditions of the row.
+            directory: The directory to write the file in.
+
+        Returns:
+            The path of the file.
+        """
+        binary = isinstance(column.type, BINARY_TYPES)
+        path = directory / f"{uuid4().hex}{'.bin' if binary else '.txt'}"
+        source = lob_source(column, column.type)
+        offset = 1
+        with open(path, 'wb') as lob_file:
+            while True:
+                chunk = conn.execute(
+                    sqlalchemy.select(
+                        sqlalchemy.func.SUBSTRING(source, offset, LOB_CHUNK_SIZE)
+                    ).where(*key_clause)
+                ).scalar()
+                if not chunk:
+                    break
+                lob_file.write(chunk if binary else chunk.encode())
+                if len(chunk) < LOB_CHUNK_SIZE:
+                    break
+                offset += LOB_CHUNK_SIZE
+        return str(path)
+
+    @property
+    def row_filter(self) -> sqlalchemy.sql.ColumnElement | None:
+        """The `row_filters` predicates set for the stream.
+
+        Returns:
+            The predicates joined with AND, or None if none are set.
+        """
+        predicates = [
+            sqlalchemy.text(f"({row_filter['where']})")
+            for row_filter in self.config.get('row_filters') or []
+            if row_filter.get('table') == self.tap_stream_id and row_filter.get('where')
+        ]
+        if not predicates:
+            return None
+        return sqlalchemy.and_(*predicates)
+
+    @property
+    def computed_columns(self) -> dict[str, dict]:
+        """The `computed_columns` set for the stream.
+
+        Expressions for the replication key and primary keys are ignored,
+        as are those of Change Tracking and CDC streams, whose changes
+        are selected from the change functions instead of the table.
+
+        Returns:
+            A dict of column names and their settings.
+        """
+        change_tables = set(self.config.get('change_tracking_tables') or [])
+        change_tables.update(
+            cdc_table.get('table') for cdc_table in self.config.get('cdc_tables') or []
+        )
+        if self.tap_stream_id in change_tables:
+            return {}
+
+        key_names = {self.replication_key, *(self.primary_keys or [])}
+        return {
+            computed_column['column']: computed_column
+            for computed_column in self.config.get('computed_columns') or []
+            if computed_column.get('table') == self.tap_stream_id
+            and computed_column.get('expression')
+            and computed_column.get('column') not in key_names
+        }
+
+    def apply_computed_columns(
+            self,
+            query: sqlalchemy.sql.Select,
+            computed_columns: dict[str, dict],
+         ) -> sqlalchemy.sql.Select:
+        """Add the computed columns to a query.
+
+        The expressions are selected as written, after the table's
+        columns, with the SQL type of the column's JSON schema so the
+        driver's values are converted like those of table columns.
+
+        Args:
+            query: The query selecting the table's columns.
+            computed_columns: The stream's computed_columns.
+
+        Returns:
+            The query with a labeled expression per computed column.
+        """
+        return query.add_columns(*[
+            sqlalchemy.literal_column(
+                f"({computed_column['expression']})",
+                self.connector.to_sql_type(
+                    computed_column_schema(computed_column.get('type'))
+                )
+            ).label(name)
+            for name, computed_column in computed_columns.items()
+        ])
+
+    @property
+    def read_options(self) -> dict:
+        """The read isolation and query hints of the stream.
+
+        Options set for the stream in `table_read_options` override the
+        global `read_isolation` and `query_hints`.
+
+        Returns:
+            A dict with read_isolation and query_hints.
+        """
+        options = {
+            'read_isolation': self.config.get('read_isolation'),
+            'query_hints': self.config.get('query_hints'),
+        }
+        for table_options in self.config.get('table_read_options') or []:
+            if table_options.get('table') == self.tap_stream_id:
+                options.update(
+                    (key, value)
+                    for key, value in table_options.items()
+                    if key in options and value is not None
+                )
+        return options
+
+    def read_rows(
+            self,
+            query: sqlalchemy.sql.Select,
+            fetch_size: int,
+            prefetch: bool = True,
+         ) -> Iterator[list]:
+        """Execute a query with the stream's read options.
+
+        Query hints are added as an OPTION clause and the query runs at
+        the stream's read isolation level. With `pipelined_fetch` on the
+        rows are fetched on a separate thread while earlier batches are
+        turned into records and written.
+
+        Args:
+            query: The query to execute.
+            fetch_size: The number of rows fetched per round trip.
+            prefetch: Whether `pipelined_fetch` applies, off for reads
+                that are already drained on their own threads.
+
+        Returns:
+            Batches of rows from mssqlConnector.stream_rows().
+        """
+        options = self.read_options
+        if options['query_hints']:
+            query = query.with_statement_hint(
+                f"OPTION ({', '.join(options['query_hints'])})",
+                dialect_name="mssql"
+            )
+        batches = self.connector.stream_rows(
+            query,
+            fetch_size,
+            READ_ISOLATION_LEVELS.get(options['read_isolation']),
+            timings=self.timings,
+            sizer=self.fetch_sizer
+        )
+        if not (prefetch and self.config.get('pipelined_fetch')):
+            return batches
+
+        max_rows = self.config.get('pipeline_max_rows')
+        max_bytes = self.config.get('pipeline_max_bytes')
+        target_bytes = self.config.get('fetch_target_bytes')
+        if target_bytes:
+            # Fetches are sized in bytes so the pipeline is bounded in bytes too
+            max_rows = max_rows or MAX_ADAPTIVE_BATCH_ROWS * 2
+            max_bytes = max_bytes or target_bytes * 2
+        return prefetch_batches(
+            batches,
+            max_rows=max_rows or fetch_size * 2,
+            max_bytes=max_bytes
+        )
+
+    @contextmanager
+    def released_sync_lock(self) -> Iterator[None]:
+        """Let other streams run while this one waits on SQL Server.
+
+        When streams are synced concurrently the sync lock is held
+        while SDK code runs, so state and Singer messages are only
+        touched by one stream at a time. It is released around
+        database round trips so their latency overlaps.
+
+        Yields:
+            None
+        """
+        if self.sync_lock is None:
+            yield
+            return
+
+        self.sync_lock.release()
+        try:
+            yield
+        finally:
+            self.sync_lock.acquire()
+
+    def iter_unlocked(self, batches: Iterable[list]) -> Iterator[list]:
+        """Yield batches, fetching each one with the sync lock released.
+
+        Args:
+            batches: Batches of rows, such as mssqlConnector.stream_rows().
+
+        Yields:
+            Each batch of rows.
+        """
+        iterator = iter(batches)
+        while True:
+            with self.released_sync_lock():
+                batch = next(iterator, None)
+            if batch is None:
+                return
+            yield batch
+
+    @property
+    def partition_key(self) -> str | None:
+        """The column full table reads are split on.
+
+        This is the column set for the stream in the `partition_keys`
+        config or, when none is set, a single column primary key.
+
+        Returns:
+            The column name, or None if the stream is not partitioned.
+        """
+        if self.config.get('partition_count', 1) < 2 or self.replication_key:
+            return None
+
+        for partition_key in self.config.get('partition_keys') or []:
+            if partition_key.get('table') == self.tap_stream_id:
+                return partition_key.get('partition_key')
+
+        if self.primary_keys and len(self.primary_keys) == 1:
+            return self.primary_keys[0]
+
+        return None
+
+    def get_partition_contexts(
+            self,
+            table: sqlalchemy.Table,
+         ) -> list[dict] | None:
+        """Split the stream into key ranges using the partition key MIN/MAX.
+
+        The first and last ranges are open ended so rows written
+        after the bounds are read are still picked up.
+
+        Args:
+            table: The table object the records are selected from.
+
+        Returns:
+            A list of partition contexts, or None if the table can't be split.
+        """
+        partition_key = self.partition_key
+        if not partition_key or partition_key not in table.columns:
+            return None
+
+        partition_col = table.columns[partition_key]
+        if column_python_type(partition_col.type) not in (
+            int,
+            Decimal,
+            datetime.datetime,
+            datetime.date
+        ):
+            self.logger.warning(
+                f"Stream '{self.name}' can't be partitioned on column "
+                f"'{partition_key}' of type {partition_col.type}."
+            )
+            return None
+
+        lower, upper = self.connector.get_column_bounds(partition_col, self.row_filter)
+        if lower is None:
+            return None
+
+        boundaries = split_range(lower, upper, self.config['partition_count'])
+        ranges = zip([None, *boundaries], [*boundaries, None])
+
+        return [
+            {'partition_lower': range_lower, 'partition_upper': range_upper}
+            for range_lower, range_upper in ranges
+        ]
+
+    @property
+    def change_tracking(self) -> bool:
+        """Whether the stream is synced with SQL Server Change Tracking.
+
+        Streams listed in `change_tracking_tables` that have a primary
+        key and no replication key use Change Tracking.
+
+        Returns:
+            True if the stream uses Change Tracking.
+        """
+        return (
+            self.tap_stream_id in (self.config.get('change_tracking_tables') or [])
+            and bool(self.primary_keys)
+            and not self.replication_key
+        )
+
+    def get_change_tracking_query(
+            self,
+            table: sqlalchemy.Table,
+            last_version: int,
+         ) -> sqlalchemy.sql.Select:
+        """Return a query for the rows changed since a Change Tracking version.
+
+        The changed primary keys from CHANGETABLE(CHANGES ...) are joined
+        back to the table. Deleted rows only have their primary key and
+        `_sdc_deleted_at` set, or are skipped when the stream schema
+        has no `_sdc_deleted_at` property.
+
+        Args:
+            table: The table object the records are selected from.
+            last_version: The version the last sync read up to.
+
+        Returns:
+            The query ordered by change version.
+        """
+        changes = sqlalchemy.func.CHANGETABLE(
+            sqlalchemy.text(
+                "CHANGES " + self.connector._dialect.identifier_preparer.format_table(table)
+            ),
+            last_version
+        ).table_valued(
+            "SYS_CHANGE_VERSION",
+            "SYS_CHANGE_OPERATION",
+            *self.primary_keys
+        ).alias("ct")
+
+        columns = [
+            changes.c[column.name].label(column.name)
+            if column.name in self.primary_keys else column
+            for column in table.columns
+        ]
+        query = sqlalchemy.select(*columns).select_from(
+            changes.outerjoin(
+                table,
+                sqlalchemy.and_(
+                    *[table.columns[key] == changes.c[key] for key in self.primary_keys]
+                )
+            )
+        )
+
+        if "_sdc_deleted_at" in self.schema["properties"]:
+            query = query.add_columns(
+                sqlalchemy.case(
+                    (
+                        changes.c.SYS_CHANGE_OPERATION == "D",
+                        sqlalchemy.func.SYSUTCDATETIME()
+                    ),
+                    else_=None
+                ).label("_sdc_deleted_at")
+            )
+        else:
+            query = query.where(changes.c.SYS_CHANGE_OPERATION != "D")
+
+        return query.order_by(changes.c.SYS_CHANGE_VERSION)
+
+    @property
+    def cdc_capture_instance(self) -> str | None:
+        """The CDC capture instance the stream is synced from.
+
+        This is the capture instance set for the stream in `cdc_tables`,
+        which defaults to the SQL Server default of schema_table.
+        Streams with a replication key are not synced from CDC.
+
+        Returns:
+            The capture instance name, or None if the stream does not use CDC.
+        """
+        if self.replication_key:
+            return None
+
+        for cdc_table in self.config.get('cdc_tables') or []:
+            if cdc_table.get('table') == self.tap_stream_id:
+                return cdc_table.get('capture_instance') or self.tap_stream_id.replace(
+                    '-', '_', 1
+                )
+
+        return None
+
+    def get_cdc_changes(
+            self,
+            table: sqlalchemy.Table,
+            last_lsn: bytes,
+            max_lsn: bytes,
+         ) -> sqlalchemy.sql.FromClause:
+        """Return the CDC changes after last_lsn up to and including max_lsn.
+
+        This selects from cdc.fn_cdc_get_all_changes_<capture_instance>,
+        which has a column per table column and the CDC_ORDER_COLUMNS.
+
+        Args:
+            table: The table object the records are selected from.
+            last_lsn: The LSN the last sync read up to.
+            max_lsn: The LSN to read up to.
+
+        Returns:
+            The changes as a table valued function.
+        """
+        get_all_changes = getattr(
+            sqlalchemy.func.cdc,
+            f"fn_cdc_get_all_changes_{self.cdc_capture_instance}"
+        )
+        return get_all_changes(
+            sqlalchemy.func.sys.fn_cdc_increment_lsn(
+                sqlalchemy.literal(last_lsn, mssql.BINARY(10))
+            ),
+            sqlalchemy.literal(max_lsn, mssql.BINARY(10)),
+            "all"
+        ).table_valued(
+            *CDC_ORDER_COLUMNS,
+            *[column.name for column in table.columns]
+        ).alias("changes")
+
+    def get_cdc_query(
+            self,
+            table: sqlalchemy.Table,
+            last_lsn: bytes,
+            max_lsn: bytes,
+         ) -> sqlalchemy.sql.Select:
+        """Return a query for the CDC changes between two LSNs.
+
+        Inserts, updates, and deletes come in the order they were made.
+        Deleted rows have `_sdc_deleted_at` set, or are skipped when the
+        stream schema has no `_sdc_deleted_at` property. The
+        CDC_ORDER_COLUMNS are selected last so pages can be keyed on them.
+
+        Args:
+            table: The table object the records are selected from.
+            last_lsn: The LSN the last sync read up to.
+            max_lsn: The LSN to read up to.
+
+        Returns:
+            The query ordered by LSN.
+        """
+        changes = self.get_cdc_changes(table, last_lsn, max_lsn)
+        operation = changes.c["__$operation"]
+        query = sqlalchemy.select(
+            *[changes.c[column.name] for column in table.columns]
+        )
+
+        if "_sdc_deleted_at" in self.schema["properties"]:
+            query = query.add_columns(
+                sqlalchemy.case(
+                    (
+                        operation == CDC_DELETE,
+                        sqlalchemy.literal(
+                            datetime.datetime.utcnow(),
+                            sqlalchemy.DateTime()
+                        )
+                    ),
+                    else_=None
+                ).label("_sdc_deleted_at")
+            )
+        else:
+            query = query.where(operation != CDC_DELETE)
+
+        order_columns = [changes.c[name] for name in CDC_ORDER_COLUMNS]
+        return query.add_columns(*order_columns).order_by(*order_columns)
+
+    def iter_cdc_pages(
+            self,
+            query: sqlalchemy.sql.Select,
+            fetch_size: int,
+         ) -> Iterator[list]:
+        """Read CDC changes, a page at a time when `keyset_page_size` is set.
+
+        Pages are keyed on the CDC_ORDER_COLUMNS. After each page the
+        stream state is moved up to the last transaction read in full
+        and a STATE message is written, unless the stream is batched.
+
+        Args:
+            query: A query from get_cdc_query().
+            fetch_size: The number of rows fetched per round trip.
+
+        Yields:
+            Batches of rows, like mssqlConnector.stream_rows().
+        """
+        page_size = self.config.get('keyset_page_size')
+        if not page_size:
+            yield from self.read_rows(query, fetch_size)
+            return
+
+        order_columns = list(query.selected_columns)[-len(CDC_ORDER_COLUMNS):]
+        lsn_index = len(query.selected_columns) - len(CDC_ORDER_COLUMNS)
+        query = query.limit(page_size)
+        checkpoint = not self.get_batch_config(self.config)
+
+        # The LSN of the transaction being read and the last one read in full
+        open_lsn = None
+        complete_lsn = None
+        page_query = query
+        while True:
+            row_count = 0
+            last_row = None
+            for rows in self.read_rows(page_query, fetch_size):
+                row_count += len(rows)
+                last_row = rows[-1]
+                for row in rows:
+                    if row[lsn_index] != open_lsn:
+                        complete_lsn, open_lsn = open_lsn, row[lsn_index]
+                yield rows
+
+            if row_count < page_size:
+                return
+
+            if checkpoint and complete_lsn is not None:
+                # Every row of the page has been synced. This runs
+                # while iter_unlocked() has the sync lock released.
+                with self.sync_lock or nullcontext():
+                    self.stream_state['cdc_lsn'] = complete_lsn.hex()
+                    self._write_state_message()
+
+            page_query = query.where(
+                keyset_predicate(order_columns, list(last_row[lsn_index:]))
+            )
+
+    @property
+    def resumable_full_table(self) -> bool:
+        """Whether a full table read resumes from the last record synced.
+
+        Streams without a replication key are read in primary key order
+        when `resumable_full_table` is on. The primary key of the last
+        record is kept in `full_table_bookmark` in the stream state,
+        and `full_table_completed_at` is set once every row is read.
+        Partitioned, Change Tracking, and CDC streams are not resumable.
+
+        Returns:
+            True if the stream is read in resumable primary key order.
+        """
+        return (
+            bool(self.config.get('resumable_full_table'))
+            and bool(self.primary_keys)
+            and not self.replication_key
+            and not self.partition_key
+            and not self.change_tracking
+            and not self.cdc_capture_instance
+        )
+
+    def _increment_stream_state(
+            self,
+            latest_record: dict[str, Any],
+            *,
+            context: dict | None = None,
+         ) -> None:
+        """Update the stream state with a record that has been synced.
+
+        Resumable full table reads bookmark the record's primary key,
+        STATE messages are written every STATE_MSG_FREQUENCY records.
+
+        Args:
+            latest_record: The record.
+            context: Stream partition or context dictionary.
+        """
+        super()._increment_stream_state(latest_record, context=context)
+        if self._bookmark_keys:
+            self.stream_state['full_table_bookmark'] = [
+                to_bookmark_value(latest_record[key]) for key in self._bookmark_keys
+            ]
+
+    @property
+    def keyset_page_size(self) -> int | None:
+        """The rows per page of keyset paginated incremental reads.
+
+        Pages are ordered on the replication key and then the primary
+        key, so a stream needs a primary key to be paginated.
+
+        Returns:
+            The page size, or None if the stream is read in one query.
+        """
+        page_size = self.config.get('keyset_page_size')
+        if not page_size or not self.replication_key or not self.primary_keys:
+            return None
+        return page_size
+
+    @property
+    def is_sorted(self) -> bool:
+        """Whether records arrive in replication key order.
+
+        Keyset paginated streams are sorted, which makes the SDK save
+        the replication key bookmark as it goes instead of at the end,
+        so an interrupted sync resumes from the last page written.
+
+        Returns:
+            True if the stream is keyset paginated.
+        """
+        return self.keyset_page_size is not None
+
+    @property
+    def check_sorted(self) -> bool:
+        """Whether the SDK checks records arrive in replication key order.
+
+        Keyset pages are ordered by the server, with its collation for
+        strings and its own ordering for UNIQUEIDENTIFIER and
+        DATETIMEOFFSET, which Python comparisons don't always agree
+        with. The order is not checked for keyset paginated streams.
+
+        Returns:
+            False if the stream is keyset paginated.
+        """
+        return self.keyset_page_size is None
+
+    def iter_keyset_pages(
+            self,
+            query: sqlalchemy.sql.Select,
+            table: sqlalchemy.Table,
+            fetch_size: int,
+         ) -> Iterator[list]:
+        """Read a query a page at a time with keyset pagination.
+
+        Each page is a TOP N query for the rows after the last row of
+        the page before, ordered on the replication key and primary key.
+        A STATE message is written between pages, unless the stream is
+        batched where STATE has to follow the BATCH message.
+
+        Args:
+            query: The query ordered on the replication key.
+            table: The table object the records are selected from.
+            fetch_size: The number of rows fetched per round trip.
+
+        Yields:
+            Batches of rows, like mssqlConnector.stream_rows().
+        """
+        page_size = self.keyset_page_size
+        key_names = [self.replication_key] + [
+            key for key in self.primary_keys if key != self.replication_key
+        ]
+        key_columns = [table.columns[key] for key in key_names]
+        column_names = list(query.selected_columns.keys())
+        key_indexes = [column_names.index(key) for key in key_names]
+        query = query.order_by(*key_columns[1:]).limit(page_size)
+        checkpoint = not self.get_batch_config(self.config)
+
+        page_query = query
+        while True:
+            row_count = 0
+            last_row = None
+            for rows in self.read_rows(page_query, fetch_size):
+                row_count += len(rows)
+                last_row = rows[-1]
+                yield rows
+
+            if row_count < page_size:
+                return
+
+            if checkpoint:
+                # Every row of the page has been synced. This runs
+                # while iter_unlocked() has the sync lock released.
+                with self.sync_lock or nullcontext():
+                    self._write_state_message()
+
+            page_query = query.where(
+                keyset_predicate(
+                    key_columns,
+                    [last_row[index] for index in key_indexes]
+                )
+            )
+
+    def apply_partition(
+            self,
+            query: sqlalchemy.sql.Select,
+            table: sqlalchemy.Table,
+            context: dict,
+         ) -> sqlalchemy.sql.Select:
+        """Limit a query to the key range in a partition context.
+
+        Ranges include the lower bound and exclude the upper bound.
+        NULL keys are read with the first range.
+
+        Args:
+            query: The query to filter.
+            table: The table object the records are selected from.
+            context: A context from get_partition_contexts().
+
+        Returns:
+            The filtered query.
+        """
+        partition_col = table.columns[self.partition_key]
+        lower = context.get('partition_lower')
+        upper = context.get('partition_upper')
+
+        if lower is None and upper is not None:
+            query = query.where(
+                sqlalchemy.or_(partition_col < upper, partition_col.is_(None))
+            )
+        elif lower is not None:
+            query = query.where(partition_col >= lower)
+            if upper is not None:
+                query = query.where(partition_col < upper)
+
+        return query
+
+    def post_process(
+        self,
+        row: dict,
+        context: dict | None = None,  # noqa: ARG002
+    ) -> dict | None:
+        """As needed, append or transform raw data to match expected structure.
+
+        Optional. This method gives developers an opportunity to "clean up" the results
+        prior to returning records to the downstream tap - for instance: cleaning,
+        renaming, or appending properties to the raw record result returned from the
+        API.
+
+        Developers may also return `None` from this method to filter out
+        invalid or not-applicable records from the stream.
+
+        Args:
+            row: Individual record in the stream.
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The resulting record dict, or `None` if the record should be excluded.
         """
         # We change the name to record so when the change breaking
         # change from row to record is done in SDK 1.0 the edits
         # to accomidate the swithc will be two
         record: dict = row
 
-        # Get the Stream Properties Dictornary from the Schema
-        properties: dict = self.schema.get('properties')
-
-        for key, value in record.items():
+        for key, converter in self.row_converters:
+            value = record.get(key)
             if value is not None:
-                # Get the Item/Column property
-                property_schema: dict = properties.get(key)
-                # Date in ISO format
-                if isinstance(value, datetime.date):
-                    record.update({key: value.isoformat()})
-                # Encode base64 binary fields in the record
-                if property_schema.get('contentEncoding') == 'base64':
-                    record.update({key: b64encode(value).decode()})
+                record[key] = converter(value)
 
         return record
 
+    def _write_record_message(self, record: dict) -> None:
+        """Write out a RECORD message with the stream's serializer.
+
+        Stdout is not flushed after each record, it is flushed with
+        the next STATE message.
+
+        Args:
+            record: A single stream record.
+        """
+        format_message = self.serializer.format_message
+        timings = self.timings
+        if timings is None:
+            for record_message in self._generate_record_messages(record):
+                sys.stdout.write(format_message(record_message.to_dict()) + "\n")
+        else:
+            start = time.perf_counter()
+            messages = [
+                record_message.to_dict()
+                for record_message in self._generate_record_messages(record)
+            ]
+            transformed = time.perf_counter()
+            lines = [format_message(message) + "\n" for message in messages]
+            serialized = time.perf_counter()
+            for line in lines:
+                sys.stdout.write(line)
+            timings.add("transform", transformed - start)
+            timings.add("serialize", serialized - transformed)
+            timings.add(
+                "write",
+                time.perf_counter() - serialized,
+                size=sum(len(line) for line in lines)
+            )
+
+        self._is_state_flushed = False
+
+    def get_batches(
+        self,
+        batch_config: BatchConfig,
+        context: dict | None = None,
+    ) -> Iterable[tuple[BaseBatchFileEncoding, list[str]]]:
+        """Batch generator function.
+
+        Batch files are JSON Lines unless the encoding format is parquet
+        or arrow, which are written with their column types taken from
+        the SQL types of the table, and of the JSON schema for properties
+        that are not table columns or that are computed columns.
+
+        When `batch_workers` is set, records for the next batches are read
+        while earlier ones are still being written. The stream state is
+        set back to where it was when each batch was read while its
+        manifest is yielded, so the STATE message written after a BATCH
+        message never gets ahead of the records in the files.
+
+        Args:
+            batch_config: Batch config for this stream.
+            context: Stream partition or context dictionary.
+
+        Yields:
+            A tuple of (encoding, manifest) for each batch.
+        """
+        worker_options = {
+            'workers': self.config.get('batch_workers', 0),
+            'worker_type': self.config.get('batch_worker_type', 'thread'),
+            'compresslevel': self.config.get('batch_compression_level', 9),
+        }
+        if self.config.get('batch_target_bytes'):
+            worker_options['sizer'] = AdaptiveBatchSize(
+                self.config['batch_target_bytes'],
+                estimate_record_size(self.get_selected_schema())
+            )
+        if batch_config.encoding.format in ARROW_BATCH_FORMATS:
+            schema = self.get_selected_schema()
+            # Computed columns, and LOB columns synced as a hash or file
+            # path, don't have the type of their table column
+            schema_typed_columns = set(self.computed_columns) | {
+                name for name, policy in self.lob_policies.items()
+                if policy.get('policy') in ('hash', 'file')
+            }
+            with self.released_sync_lock():
+                table = self.connector.get_table(
+                    full_table_name=self.fully_qualified_name,
+                    column_names=[
+                        name for name in schema["properties"]
+                        if name not in schema_typed_columns
+                    ],
+                )
+            batcher = ArrowBatcher(
+                tap_name=self.tap_name,
+                stream_name=self.name,
+                batch_config=batch_config,
+                arrow_schema=build_arrow_schema(table.columns, schema),
+                **worker_options
+            )
+        else:
+            batcher = JSONLinesBatcher(
+                tap_name=self.tap_name,
+                stream_name=self.name,
+                batch_config=batch_config,
+                serializer=self.serializer,
+                timings=self.timings,
+                **worker_options
+            )
+        records = self._sync_records(context, write_messages=False)
+
+        if not batcher.workers:
+            for manifest in batcher.get_batches(records=records):
+                yield batch_config.encoding, manifest
+            return
+
+        # Copies of the stream state taken as each full batch is read
+        state_snapshots: deque = deque()
+
+        def chunk_size() -> int:
+            return batcher.sizer.size if batcher.sizer else batch_config.batch_size
+
+        def snapshot_records() -> Iterator[dict]:
+            # A chunk is full when the batcher asks for the record after
+            # it, by then an adaptive chunk size is already updated for
+            # the next chunk. The state is copied before that record is
+            # read and kept only if there is one, the last chunk goes
+            # with the final state.
+            chunk_end = chunk_size()
+            snapshot = None
+            for i, record in enumerate(records, start=1):
+                if snapshot is not None:
+                    state_snapshots.append(snapshot)
+                    snapshot = None
+                yield record
+                if i == chunk_end:
+                    snapshot = copy.deepcopy(self.stream_state)
+                    chunk_end += chunk_size()
+
+        for manifest in batcher.get_batches(records=snapshot_records()):
+            if not state_snapshots:
+                # The last batch goes with the final state
+                yield batch_config.encoding, manifest
+                continue
+
+            stream_state = self.stream_state
+            current_state = copy.deepcopy(stream_state)
+            stream_state.clear()
+            stream_state.update(state_snapshots.popleft())
+            try:
+                yield batch_config.encoding, manifest
+            finally:
+                stream_state.clear()
+                stream_state.update(current_state)
+                # The STATE message written was the snapshot
+                self._is_state_flushed = False
+
     def get_records(self, context: dict | None) -> Iterable[dict[str, Any]]:
         """Return a generator of record-type dictionary objects.
 
         If the stream has a replication_key value defined, records will be
         sorted by the incremental key. If the stream also has an available
         starting bookmark, the records will be filtered for values greater
-        than or equal to the bookmark value.
+        than or equal to the bookmark value. ROWVERSION replication keys
+        are filtered for values greater than the bookmark and below
+        MIN_ACTIVE_ROWVERSION().
+
+        Full table streams with a partition key are split into key ranges
+        which are read at the same time on separate pooled connections.
+        Incremental streams are read in keyset pages when
+        `keyset_page_size` is set. Change Tracking and CDC streams read
+        the whole table once and then only the rows changed since the
+        last sync. Reads of the table select the stream's
+        `computed_columns` and only the rows its `row_filters` match.
+        Other full table streams resume from their last primary key
+        bookmark when `resumable_full_table` is on.
 
         Args:
             context: If partition context is provided, will read specifically
@@ -498,18 +3412,133 @@ class mssqlStream(SQLStream):
             NotImplementedError: If partition is passed in context and the
                 stream does not support partitioning.
         """
-        if context:
+        if context and not self.partition_key:
             raise NotImplementedError(
                 f"Stream '{self.name}' does not support partitioning.",
             )
 
-        selected_column_names = self.get_selected_schema()["properties"].keys()
-        table = self.connector.get_table(
-            full_table_name=self.fully_qualified_name,
-            column_names=selected_column_names,
-        )
+        lob_policies = self.lob_policies
+        selected_properties = self.get_selected_schema()["properties"]
+        computed_columns = {
+            name: computed_column
+            for name, computed_column in self.computed_columns.items()
+            if name in selected_properties
+        }
+        # Computed columns replace table columns of the same name
+        selected_column_names = [
+            name for name in selected_properties.keys()
+            if lob_policies.get(name, {}).get('policy') != 'skip'
+            and name not in computed_columns
+        ]
+        with self.released_sync_lock():
+            table = self.connector.get_table(
+                full_table_name=self.fully_qualified_name,
+                column_names=selected_column_names,
+            )
         query = table.select()
 
+        # Bookmarks saved in the stream state once every row has been synced
+        bookmarks: dict = {}
+        changes_only = False
+        column_names = None
+        if self.cdc_capture_instance and not context:
+            with self.released_sync_lock():
+                min_lsn, max_lsn = self.connector.get_cdc_lsn_range(
+                    self.cdc_capture_instance
+                )
+            last_lsn = self.stream_state.get('cdc_lsn')
+            if min_lsn is None or max_lsn is None:
+                self.logger.warning(
+                    "CDC capture instance '%s' was not found, "
+                    "reading the full table.",
+                    self.cdc_capture_instance
+                )
+            else:
+                bookmarks['cdc_lsn'] = max_lsn.hex()
+                # The full table is read on the first sync and when the
+                # changes were cleaned up before they could be read
+                if last_lsn is not None and bytes.fromhex(last_lsn) >= min_lsn:
+                    if bytes.fromhex(last_lsn) >= max_lsn:
+                        return
+                    changes_only = True
+                    query = self.get_cdc_query(table, bytes.fromhex(last_lsn), max_lsn)
+        elif self.change_tracking and not context:
+            with self.released_sync_lock():
+                current_version, min_valid_version = (
+                    self.connector.get_change_tracking_versions(table)
+                )
+            last_version = self.stream_state.get('change_tracking_version')
+            if min_valid_version is None:
+                self.logger.warning(
+                    "Change Tracking is not enabled for '%s', "
+                    "reading the full table.",
+                    self.fully_qualified_name
+                )
+            else:
+                bookmarks['change_tracking_version'] = current_version
+                # The full table is read on the first sync and when the
+                # changes were cleaned up before they could be read
+                if last_version is not None and last_version >= min_valid_version:
+                    changes_only = True
+                    query = self.get_change_tracking_query(table, last_version)
+
+        converted_columns: set[str] = set()
+        if self.native_type_conversion and not changes_only:
+            # Key values are bookmarked and paged on, so they are read
+            # as the driver returns them
+            query, converted_columns = build_native_query(
+                table,
+                self.config.get('driver_type'),
+                skip_columns=[self.replication_key, *(self.primary_keys or [])],
+            )
+
+        file_columns: set[str] = set()
+        if lob_policies:
+            query, applied = self.apply_lob_policies(query, table)
+            # Hashes and file paths are strings the row converters
+            # of the column types must not touch
+            converted_columns |= {
+                name for name, policy in applied.items() if policy != 'truncate'
+            }
+            file_columns = {
+                name for name, policy in applied.items() if policy == 'file'
+            }
+
+        if computed_columns:
+            query = self.apply_computed_columns(query, computed_columns)
+
+        # Changes are not filtered so updates and deletes of rows
+        # synced before still reach the target
+        row_filter = self.row_filter
+        if row_filter is not None and not changes_only:
+            query = query.where(row_filter)
+
+        if changes_only and self.cdc_capture_instance:
+            column_names = list(query.selected_columns.keys())[:-len(CDC_ORDER_COLUMNS)]
+
+        resumable = self.resumable_full_table and not context
+        if resumable:
+            key_columns = [table.columns[key] for key in self.primary_keys]
+            query = query.order_by(*key_columns)
+            bookmark = self.stream_state.get('full_table_bookmark')
+            if bookmark is None:
+                # The last read was completed, start a new one
+                self.stream_state.pop('full_table_completed_at', None)
+            else:
+                self.logger.info(
+                    "Resuming stream '%s' after primary key %s.", self.name, bookmark
+                )
+                query = query.where(
+                    keyset_predicate(
+                        key_columns,
+                        [
+                            from_bookmark_value(value, column.type)
+                            for value, column in zip(bookmark, key_columns)
+                        ]
+                    )
+                )
+            self._bookmark_keys = list(self.primary_keys)
+
         if self.replication_key:
             replication_key_col = table.columns[self.replication_key]
             query = query.order_by(replication_key_col)
@@ -522,7 +3551,7 @@ class mssqlStream(SQLStream):
             # self.logger.info(f"Is the a replication_key_col python type datetime or date: {(replication_key_col.type.python_type in (datetime.datetime, datetime.date))}")
             # self.logger.info('\n')
             # # remove all to here in final #
-            if replication_key_col.type.python_type in (
+            if column_python_type(replication_key_col.type) in (
                 datetime.datetime,
                 datetime.date
             ):
@@ -530,7 +3559,16 @@ class mssqlStream(SQLStream):
             else:
                 start_val = self.get_starting_replication_key_value(context)
 
-            if start_val:
+            if isinstance(replication_key_col.type, RowVersion):
+                # Rowversions are unique so the bookmarked row is not read
+                # again. Rows at or above MIN_ACTIVE_ROWVERSION() may be
+                # in open transactions and are left for the next sync.
+                query = query.where(
+                    replication_key_col < sqlalchemy.func.MIN_ACTIVE_ROWVERSION()
+                )
+                if start_val is not None:
+                    query = query.where(replication_key_col > start_val)
+            elif start_val:
                 query = query.where(replication_key_col >= start_val)
 
         if self.ABORT_AT_RECORD_COUNT is not None:
@@ -564,10 +3602,106 @@ class mssqlStream(SQLStream):
         # self.logger.info('\n')
         # # remove all to here in final #
 
-        with self.connector._connect() as conn:
-            for record in conn.execute(query):
-                transformed_record = self.post_process(dict(record._mapping))
-                if transformed_record is None:
+        fetch_size: int = self.config.get('fetch_size', DEFAULT_FETCH_SIZE)
+
+        if context:
+            batches = self.read_rows(
+                self.apply_partition(query, table, context),
+                fetch_size
+            )
+        elif changes_only and self.cdc_capture_instance:
+            batches = self.iter_cdc_pages(query, fetch_size)
+        elif changes_only:
+            batches = self.read_rows(query, fetch_size)
+        elif self.partition_key:
+            with self.released_sync_lock():
+                partition_contexts = self.get_partition_contexts(table) or [{}]
+            batches = fetch_concurrently(
+                [
+                    self.read_rows(
+                        self.apply_partition(query, table, partition_context),
+                        fetch_size,
+                        prefetch=False
+                    )
+                    for partition_context in partition_contexts
+                ],
+                max_workers=(
+                    self.config.get('partition_workers')
+                    or len(partition_contexts)
+                )
+            )
+        elif self.keyset_page_size:
+            batches = self.iter_keyset_pages(query, table, fetch_size)
+        elif self.config.get('keyset_page_size') and self.replication_key:
+            self.logger.warning(
+                "Stream '%s' has no primary key to page on, "
+                "it is read in one query.",
+                self.name
+            )
+            batches = self.read_rows(query, fetch_size)
+        else:
+            batches = self.read_rows(query, fetch_size)
+
+        column_names = column_names or list(query.selected_columns.keys())
+        if file_columns:
+            batches = self.write_lob_files(batches, table, column_names, file_columns)
+
+        yield from self.iter_records(batches, column_names, converted_columns)
+        self.stream_state.update(bookmarks)
+        if resumable:
+            self._bookmark_keys = None
+            self.stream_state.pop('full_table_bookmark', None)
+            self.stream_state['full_table_completed_at'] = (
+                datetime.datetime.utcnow().isoformat()
+            )
+        # The last record's STATE message may already be written
+        self._is_state_flushed = False
+
+    def iter_records(
+            self,
+            batches: Iterable[list],
+            column_names: list[str],
+            converted_columns: Iterable[str] = (),
+         ) -> Iterator[dict]:
+        """Turn batches of rows into records.
+
+        Args:
+            batches: Batches of rows, such as mssqlConnector.stream_rows().
+            column_names: The names of the columns in each row. Columns
+                after these are left out of the records.
+            converted_columns: Columns already converted by SQL Server
+                or the driver, which skip their row converter.
+
+        Yields:
+            One dict per record.
+        """
+        fast_path = type(self).post_process is mssqlStream.post_process
+        if fast_path:
+            # Nothing overrides post_process so convert the row tuples
+            # directly and skip building a dict from the row mapping
+            row_converters = [
+                (key, converter)
+                for key, converter in self.row_converters
+                if key not in converted_columns
+            ]
+            transform = build_row_transformer(column_names, row_converters)
+        else:
+            def transform(row: Sequence) -> dict | None:
+                return self.post_process(dict(zip(column_names, row)))
+
+        timings = self.timings
+        for rows in self.iter_unlocked(batches):
+            if timings is None:
+                records = map(transform, rows)
+            else:
+                with timings.time("transform"):
+                    records = list(map(transform, rows))
+
+            if fast_path:
+                yield from records
+                continue
+            for record in records:
+                if record is None:
                     # Record filtered out during post_process()
                     continue
-                yield transformed_record
+                yield record
@@ -0,0 +1,280 @@
+"""Per-stream timing breakdown, metrics export, and profiling.
+
+StreamTimings splits where a stream's sync spends its time into the
+stages records go through, from SQL Server to stdout or batch files.
+The totals are logged as SDK METRIC lines and can be written to a
+Prometheus text file or a JSON summary for all streams.
+"""
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+
+from contextlib import contextmanager
+from enum import Enum
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from singer_sdk import metrics
+
+# The stages a stream's sync time is split into:
+# query: executing a query until its results are ready
+# fetch: fetching batches of rows from the driver
+# transform: converting rows to records and records to messages
+# serialize: encoding records and messages as JSON
+# compress: compressing batch files
+# write: writing messages to stdout and batch files to storage
+STAGES = ("query", "fetch", "transform", "serialize", "compress", "write")
+PROFILERS = ("cprofile", "py-spy")
+
+
+class StreamMetric(str, Enum):
+    """The metrics logged for a stream."""
+
+    STAGE_DURATION = "stage_duration"
+    SYNC_DURATION = "sync_duration"
+    FETCHED_ROWS = "fetched_rows"
+    WRITTEN_BYTES = "written_bytes"
+
+
+class StreamTimings:
+    """Time, rows, and bytes of one stream's sync, split by stage.
+
+    Stages can be timed from several threads, such as partition reads
+    and batch file workers, so their durations can add up to more than
+    the stream's wall time.
+    """
+
+    def __init__(self, stream_name: str) -> None:
+        """Class Default Init
+
+        Args:
+            stream_name: The name of the stream.
+        """
+        self.stream_name = stream_name
+        self.durations = dict.fromkeys(STAGES, 0.0)
+        self.rows = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self.elapsed: float | None = None
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float, rows: int = 0, size: int = 0) -> None:
+        """Add time spent in a stage.
+
+        Args:
+            stage: One of STAGES.
+            seconds: The time spent.
+            rows: Rows fetched in that time.
+            size: Bytes written in that time.
+        """
+        with self._lock:
+            self.durations[stage] += seconds
+            self.rows += rows
+            self.bytes += size
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """Time the block as a stage.
+
+        Args:
+            stage: One of STAGES.
+
+        Yields:
+            None
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def timed_batches(self, batches: Iterable[list]) -> Iterator[list]:
+        """Yield batches of rows, timing each fetch and counting the rows.
+
+        Args:
+            batches: Batches of rows from the driver.
+
+        Yields:
+            The same batches.
+        """
+        batches = iter(batches)
+        while True:
+            start = time.perf_counter()
+            rows = next(batches, None)
+            if rows is None:
+                self.add("fetch", time.perf_counter() - start)
+                return
+            self.add("fetch", time.perf_counter() - start, rows=len(rows))
+            yield rows
+
+    def finish(self) -> None:
+        """Set the wall time of the sync."""
+        self.elapsed = time.perf_counter() - self.started
+
+    def to_dict(self) -> dict:
+        """Return the timings as a JSON serializable dict."""
+        return {
+            "stream": self.stream_name,
+            "sync_seconds": self.elapsed,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "stage_seconds": dict(self.durations),
+        }
+
+    def points(self) -> list[metrics.Point]:
+        """Return the timings as SDK metric points."""
+        tags = {"stream": self.stream_name}
+        points = [
+            metrics.Point(
+                "timer",
+                StreamMetric.STAGE_DURATION,
+                round(seconds, 6),
+                dict(tags, stage=stage),
+            )
+            for stage, seconds in self.durations.items()
+        ]
+        if self.elapsed is not None:
+            points.append(
+                metrics.Point("timer", StreamMetric.SYNC_DURATION, round(self.elapsed, 6), tags)
+            )
+        points.append(metrics.Point("counter", StreamMetric.FETCHED_ROWS, self.rows, tags))
+        points.append(metrics.Point("counter", StreamMetric.WRITTEN_BYTES, self.bytes, tags))
+        return points
+
+    def log(self) -> None:
+        """Log the timings as METRIC lines."""
+        logger = metrics.get_metrics_logger()
+        for point in self.points():
+            metrics.log(logger, point)
+
+
+def prometheus_label(value: str) -> str:
+    """Return a Prometheus label value with backslashes, quotes, and newlines escaped."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_prometheus(timings: Iterable[StreamTimings]) -> str:
+    """Return stream timings in the Prometheus text exposition format.
+
+    Args:
+        timings: The timings of each stream.
+
+    Returns:
+        The metrics as text.
+    """
+    timings = list(timings)
+    lines = [
+        "# HELP tap_mssql_stage_seconds Seconds a stream spent in each sync stage.",
+        "# TYPE tap_mssql_stage_seconds gauge",
+    ]
+    for stream_timings in timings:
+        stream = prometheus_label(stream_timings.stream_name)
+        for stage, seconds in stream_timings.durations.items():
+            lines.append(
+                f'tap_mssql_stage_seconds{{stream="{stream}",stage="{stage}"}} {seconds:.6f}'
+            )
+
+    for name, help_text, kind, attribute in (
+        ("sync_seconds", "Wall time of a stream's sync.", "gauge", "elapsed"),
+        ("rows_total", "Rows fetched for a stream.", "counter", "rows"),
+        ("bytes_total", "Bytes of messages and batch files written for a stream.", "counter", "bytes"),
+    ):
+        lines.append(f"# HELP tap_mssql_{name} {help_text}")
+        lines.append(f"# TYPE tap_mssql_{name} {kind}")
+        for stream_timings in timings:
+            value = getattr(stream_timings, attribute)
+            if value is None:
+                continue
+            stream = prometheus_label(stream_timings.stream_name)
+            lines.append(f'tap_mssql_{name}{{stream="{stream}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(
+        path: str | Path,
+        timings: Iterable[StreamTimings],
+        file_format: str = "json"
+     ) -> None:
+    """Write the timings of all streams to a file.
+
+    Args:
+        path: The file to write.
+        timings: The timings of each stream.
+        file_format: json for a JSON summary or prometheus for the
+            Prometheus text format, e.g. for the node exporter's
+            textfile collector.
+    """
+    if file_format == "prometheus":
+        text = format_prometheus(timings)
+    else:
+        text = json.dumps(
+            {"streams": [stream_timings.to_dict() for stream_timings in timings]},
+            indent=2
+        )
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Written next to the file and renamed so collectors never read half a file
+    temp_path = path.with_name(f".{path.name}.tmp")
+    temp_path.write_text(text)
+    temp_path.replace(path)
+
+
+@contextmanager
+def profile(profiler: str | None, directory: str | Path, name: str) -> Iterator[None]:
+    """Profile the block with cProfile or py-spy.
+
+    cProfile profiles the calling thread and writes `<name>.prof`.
+    py-spy samples the whole process from outside and writes
+    `<name>.speedscope.json`, it must be installed and allowed to
+    attach to the process.
+
+    Args:
+        profiler: cprofile, py-spy, or None to not profile.
+        directory: The directory profiles are written to.
+        name: The name of the profile file.
+
+    Raises:
+        FileNotFoundError: If py-spy is not installed.
+
+    Yields:
+        None
+    """
+    if profiler is None:
+        yield
+        return
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    if profiler == "cprofile":
+        profiler_instance = cProfile.Profile()
+        profiler_instance.enable()
+        try:
+            yield
+        finally:
+            profiler_instance.disable()
+            profiler_instance.dump_stats(directory / f"{name}.prof")
+        return
+
+    py_spy = shutil.which("py-spy")
+    if py_spy is None:
+        raise FileNotFoundError("The py-spy profiler needs py-spy: pip install py-spy")
+    process = subprocess.Popen([
+        py_spy,
+        "record",
+        "--pid", str(os.getpid()),
+        "--format", "speedscope",
+        "--output", str(directory / f"{name}.speedscope.json"),
+    ])
+    try:
+        yield
+    finally:
+        # py-spy writes its output when interrupted
+        process.send_signal(signal.SIGINT)
+        process.wait()
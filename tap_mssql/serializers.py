@@ -0,0 +1,181 @@
+"""Record and batch serializers.
+
+JSONSerializer writes what tap-mssql has always written. OrjsonSerializer
+uses the C-accelerated orjson encoder when it is installed and falls
+back to JSONSerializer for any value orjson can't encode the same way.
+"""
+from __future__ import annotations
+
+import json
+
+from decimal import Decimal
+from typing import Any, Iterable
+
+import simplejson
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    ORJSON_OPTIONS = 0
+else:
+    # Column names are SQLAlchemy quoted_name, a str subclass orjson
+    # only takes as a key with OPT_NON_STR_KEYS
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class JSONSerializer:
+    """Standard library JSON serializer."""
+
+    name = "json"
+
+    def __init__(
+            self,
+            encoder_class: type[json.JSONEncoder] = json.JSONEncoder
+         ) -> None:
+        """Class Default Init
+
+        Args:
+            encoder_class: The JSON encoder used for batch file lines.
+        """
+        self.encoder_class = encoder_class
+
+    def encode_lines(self, records: Iterable[dict]) -> bytes:
+        """Return records as JSON Lines for a batch file.
+
+        Values JSON doesn't know, such as Decimal and datetime, are
+        written with str().
+
+        Args:
+            records: The records to encode.
+
+        Returns:
+            One JSON document per line as UTF-8 bytes.
+        """
+        return "".join(
+            json.dumps(record, cls=self.encoder_class, default=str) + "\n"
+            for record in records
+        ).encode()
+
+    def format_message(self, message: dict) -> str:
+        """Return a Singer message as a JSON string.
+
+        This matches the SDK's format_message(). Decimals are written
+        as JSON numbers and other unknown values with str().
+
+        Args:
+            message: The message as a dict.
+
+        Returns:
+            The message as a JSON string.
+        """
+        return simplejson.dumps(message, use_decimal=True, default=str)
+
+
+class OrjsonSerializer(JSONSerializer):
+    """orjson JSON serializer with the same value output as JSONSerializer.
+
+    datetime, date, and time values are passed through to str() like
+    the standard library encoder. Decimals in messages are written as
+    raw JSON numbers with orjson.Fragment, which needs orjson 3.9 or
+    later. Older versions fall back to JSONSerializer for messages
+    once a Decimal is seen. Values orjson can't encode, such as
+    integers over 64 bits, fall back too. The output has no spaces
+    after separators.
+    """
+
+    name = "orjson"
+
+    # Set when a Decimal is seen and orjson has no Fragment
+    messages_fallback = False
+
+    def encode_lines(self, records: Iterable[dict]) -> bytes:
+        """Return records as JSON Lines for a batch file.
+
+        Args:
+            records: The records to encode.
+
+        Returns:
+            One JSON document per line as UTF-8 bytes.
+        """
+        option = ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE
+        lines = []
+        for record in records:
+            try:
+                lines.append(orjson.dumps(record, default=str, option=option))
+            except orjson.JSONEncodeError:
+                lines.append(super().encode_lines([record]))
+        return b"".join(lines)
+
+    def format_message(self, message: dict) -> str:
+        """Return a Singer message as a JSON string.
+
+        Args:
+            message: The message as a dict.
+
+        Returns:
+            The message as a JSON string.
+        """
+        if self.messages_fallback:
+            return super().format_message(message)
+
+        try:
+            return orjson.dumps(
+                message,
+                default=self.message_default,
+                option=ORJSON_OPTIONS
+            ).decode()
+        except orjson.JSONEncodeError:
+            return super().format_message(message)
+
+    def message_default(self, obj: Any) -> Any:
+        """Encode the values orjson doesn't know in a Singer message.
+
+        Args:
+            obj: The value to encode.
+
+        Raises:
+            TypeError: For a Decimal when orjson.Fragment is not available.
+
+        Returns:
+            A value orjson can encode.
+        """
+        if isinstance(obj, Decimal):
+            if not hasattr(orjson, "Fragment"):
+                self.messages_fallback = True
+                raise TypeError("Decimal needs orjson.Fragment")
+            return orjson.Fragment(str(obj))
+        return str(obj)
+
+
+def get_serializer(
+        name: str = "auto",
+        encoder_class: type[json.JSONEncoder] = json.JSONEncoder
+     ) -> JSONSerializer:
+    """Return a serializer by name.
+
+    Args:
+        name: json, orjson, or auto to use orjson when it is installed.
+        encoder_class: The JSON encoder the json serializer uses for batch files.
+
+    Raises:
+        ImportError: If orjson is asked for but not installed.
+        ValueError: If the name is not known.
+
+    Returns:
+        A serializer instance.
+    """
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+
+    if name == "orjson":
+        if orjson is None:
+            raise ImportError(
+                "The orjson serializer needs orjson: pip install 'tap-mssql[orjson]'"
+            )
+        return OrjsonSerializer(encoder_class)
+
+    if name == "json":
+        return JSONSerializer(encoder_class)
+
+    raise ValueError(f"Unknown serializer '{name}', expected auto, json, or orjson.")
@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 from singer_sdk import SQLTap, SQLStream, SQLConnector
 from singer_sdk import typing as th  # JSON schema typing helpers
+from singer_sdk._singerlib import StateMessage, write_message
+from singer_sdk.tap_base import Tap
 
-from tap_mssql.client import mssqlStream, mssqlConnector
+from tap_mssql.client import mssqlStream, mssqlConnector, computed_column_schema
+from tap_mssql.instrumentation import PROFILERS
 
 
 class Tapmssql(SQLTap):
@@ -53,11 +60,129 @@ class Tapmssql(SQLTap):
                         catalog_entry["replication_key"] = replication_key.get("replication_key")
                         break
 
+        deleted_at_tables = set(self.config.get("change_tracking_tables") or [])
+        deleted_at_tables.update(
+            cdc_table.get("table") for cdc_table in self.config.get("cdc_tables") or []
+        )
+        if deleted_at_tables:
+            for catalog_entry in catalog_entries:
+                if catalog_entry.get("tap_stream_id") in deleted_at_tables:
+                    self.add_deleted_at_property(catalog_entry)
+
+        lob_policies = self.config.get("lob_policies")
+        if lob_policies:
+            for catalog_entry in catalog_entries:
+                self.apply_lob_policies(catalog_entry, lob_policies)
+
+        computed_columns = self.config.get("computed_columns")
+        if computed_columns:
+            for catalog_entry in catalog_entries:
+                if catalog_entry.get("tap_stream_id") in deleted_at_tables:
+                    continue
+                self.apply_computed_columns(catalog_entry, computed_columns)
+
         result["streams"].extend(catalog_entries)
 
         self._catalog_dict = result
         return self._catalog_dict
 
+    @staticmethod
+    def add_deleted_at_property(catalog_entry: dict) -> None:
+        """Add `_sdc_deleted_at` to a Change Tracking or CDC catalog entry.
+
+        Deleted rows are synced with only their primary key and
+        `_sdc_deleted_at` set, so the other properties become nullable.
+
+        Args:
+            catalog_entry: The catalog entry to change.
+        """
+        key_properties = catalog_entry.get("key_properties") or []
+        properties = catalog_entry["schema"]["properties"]
+        for name, jsonschema_type in properties.items():
+            types = jsonschema_type.get("type")
+            if name not in key_properties and isinstance(types, list) and "null" not in types:
+                # The type list can be shared with other schemas
+                jsonschema_type["type"] = [*types, "null"]
+
+        properties["_sdc_deleted_at"] = {
+            "type": ["string", "null"],
+            "format": "date-time",
+        }
+        catalog_entry["metadata"].append(
+            {
+                "breadcrumb": ["properties", "_sdc_deleted_at"],
+                "metadata": {"inclusion": "automatic"},
+            }
+        )
+
+    @staticmethod
+    def apply_lob_policies(catalog_entry: dict, lob_policies: list[dict]) -> None:
+        """Change the schema of LOB columns to what their policy syncs.
+
+        Skipped columns are removed, hashed columns become the hex
+        SHA2_256 hash, and file columns the path of the file written.
+        Truncated columns keep their schema. The replication key and
+        primary keys are never changed.
+
+        Args:
+            catalog_entry: The catalog entry to change.
+            lob_policies: The `lob_policies` config.
+        """
+        key_properties = set(catalog_entry.get("key_properties") or [])
+        key_properties.add(catalog_entry.get("replication_key"))
+        properties = catalog_entry["schema"]["properties"]
+        for lob_policy in lob_policies:
+            column = lob_policy.get("column")
+            if (
+                lob_policy.get("table") != catalog_entry.get("tap_stream_id")
+                or column not in properties
+                or column in key_properties
+            ):
+                continue
+
+            if lob_policy.get("policy") == "skip":
+                del properties[column]
+                catalog_entry["metadata"] = [
+                    metadata for metadata in catalog_entry["metadata"]
+                    if metadata["breadcrumb"] != ["properties", column]
+                ]
+            elif lob_policy.get("policy") == "hash":
+                properties[column] = {"type": ["string", "null"], "maxLength": 64}
+            elif lob_policy.get("policy") == "file":
+                properties[column] = {"type": ["string", "null"]}
+
+    @staticmethod
+    def apply_computed_columns(catalog_entry: dict, computed_columns: list[dict]) -> None:
+        """Add or replace the properties of computed columns.
+
+        Columns with the name of a table column replace its schema.
+        The replication key and primary keys are never changed.
+
+        Args:
+            catalog_entry: The catalog entry to change.
+            computed_columns: The `computed_columns` config.
+        """
+        key_properties = set(catalog_entry.get("key_properties") or [])
+        key_properties.add(catalog_entry.get("replication_key"))
+        properties = catalog_entry["schema"]["properties"]
+        for computed_column in computed_columns:
+            column = computed_column.get("column")
+            if (
+                computed_column.get("table") != catalog_entry.get("tap_stream_id")
+                or not computed_column.get("expression")
+                or column in key_properties
+            ):
+                continue
+
+            if column not in properties:
+                catalog_entry["metadata"].append(
+                    {
+                        "breadcrumb": ["properties", column],
+                        "metadata": {"inclusion": "available"},
+                    }
+                )
+            properties[column] = computed_column_schema(computed_column.get("type"))
+
     config_jsonschema = th.PropertiesList(
         th.Property(
             "dialect",
@@ -117,9 +242,46 @@ class Tapmssql(SQLTap):
                     "future",
                     th.StringType,
                     description="Run the engine in 2.0 mode: True, False"
+                ),
+                th.Property(
+                    "pool_size",
+                    th.IntegerType,
+                    description="The number of connections kept open in the pool"
+                ),
+                th.Property(
+                    "max_overflow",
+                    th.IntegerType,
+                    description="The number of connections opened above pool_size when needed"
+                ),
+                th.Property(
+                    "pool_pre_ping",
+                    th.BooleanType,
+                    description="Test connections when they are checked out of the pool"
+                ),
+                th.Property(
+                    "pool_recycle",
+                    th.IntegerType,
+                    description="Reopen connections older than this many seconds"
+                ),
+                th.Property(
+                    "pool_timeout",
+                    th.IntegerType,
+                    description="Seconds to wait for a connection from the pool"
                 )
             ),
-            description="SQLAlchemy Engine Paramaters: fast_executemany, future"
+            description="SQLAlchemy Engine Paramaters: fast_executemany, future, "\
+                        "pool_size, max_overflow, pool_pre_ping, pool_recycle, pool_timeout"
+        ),
+        th.Property(
+            "prewarm_connections",
+            th.IntegerType,
+            description="The number of pool connections opened at startup"
+        ),
+        th.Property(
+            "session_statements",
+            th.ArrayType(th.StringType),
+            description="SQL run once on each new connection example: "\
+                        "[\"SET NOCOUNT ON\", \"SET ARITHABORT ON\"]"
         ),
         th.Property(
             "sqlalchemy_url_query",
@@ -146,12 +308,14 @@ class Tapmssql(SQLTap):
                         th.Property(
                             "format",
                             th.StringType,
-                            description="Currently the only format is jsonl",
+                            description="The batch file format: jsonl, parquet, or arrow. "\
+                                        "parquet and arrow need the parquet extra",
                         ),
                         th.Property(
                             "compression",
                             th.StringType,
-                            description="Currently the only compression options is gzip",
+                            description="gzip for jsonl, snappy gzip zstd or none for parquet, "\
+                                        "lz4 zstd or none for arrow",
                         )
                     )
                 ),
@@ -175,6 +339,32 @@ class Tapmssql(SQLTap):
             ),
             description="Optional Batch Message configuration",
         ),
+        th.Property(
+            "batch_workers",
+            th.IntegerType,
+            default=0,
+            description="The number of workers encoding and compressing batch files "\
+                        "while the next batch is read, 0 writes them inline"
+        ),
+        th.Property(
+            "batch_worker_type",
+            th.StringType,
+            default="thread",
+            allowed_values=["thread", "process"],
+            description="Whether batch workers are threads or processes"
+        ),
+        th.Property(
+            "batch_compression_level",
+            th.IntegerType,
+            default=9,
+            description="The gzip compression level of batch files from 0 to 9"
+        ),
+        th.Property(
+            "batch_target_bytes",
+            th.IntegerType,
+            description="Size batch files to about this many uncompressed bytes "\
+                        "instead of batch_size records"
+        ),
         th.Property(
             "start_date",
             th.DateTimeType,
@@ -186,6 +376,305 @@ class Tapmssql(SQLTap):
             default=False,
             description="Turn on Higher Defined(HD) JSON Schema types to assist Targets"
         ),
+        th.Property(
+            "fetch_size",
+            th.IntegerType,
+            default=10000,
+            description="The number of rows fetched from SQL Server per round trip"
+        ),
+        th.Property(
+            "fetch_target_bytes",
+            th.IntegerType,
+            description="Size each fetch to about this many bytes of rows "\
+                        "instead of fetch_size rows"
+        ),
+        th.Property(
+            "pipelined_fetch",
+            th.BooleanType,
+            default=False,
+            description="Fetch rows on a separate thread while earlier rows are "\
+                        "turned into records and written"
+        ),
+        th.Property(
+            "pipeline_max_rows",
+            th.IntegerType,
+            description="The rows fetched ahead before the fetch thread waits, "\
+                        "defaults to twice fetch_size"
+        ),
+        th.Property(
+            "pipeline_max_bytes",
+            th.IntegerType,
+            description="The approximate bytes of rows fetched ahead before the "\
+                        "fetch thread waits"
+        ),
+        th.Property(
+            "partition_count",
+            th.IntegerType,
+            default=1,
+            description="The number of key ranges full table streams are split into"
+        ),
+        th.Property(
+            "partition_workers",
+            th.IntegerType,
+            description="The number of key ranges read at the same time, "\
+                        "defaults to partition_count"
+        ),
+        th.Property(
+            "partition_keys",
+            th.ArrayType(
+                th.ObjectType(
+                    th.Property(
+                        "table",
+                        th.StringType,
+                        description="The tap_stream_id of the table example: dbo-Sales"
+                    ),
+                    th.Property(
+                        "partition_key",
+                        th.StringType,
+                        description="An integer or datetime column to split the table on"
+                    )
+                )
+            ),
+            description="Partition columns for tables without a single column primary key"
+        ),
+        th.Property(
+            "read_isolation",
+            th.StringType,
+            allowed_values=["snapshot", "read_committed_snapshot", "read_uncommitted"],
+            description="The isolation level streams are read at, read_uncommitted "\
+                        "is the same as NOLOCK"
+        ),
+        th.Property(
+            "query_hints",
+            th.ArrayType(th.StringType),
+            description="Hints added to each query as an OPTION clause "\
+                        "example: [\"MAXDOP 4\"]"
+        ),
+        th.Property(
+            "table_read_options",
+            th.ArrayType(
+                th.ObjectType(
+                    th.Property(
+                        "table",
+                        th.StringType,
+                        description="The tap_stream_id of the table example: dbo-Sales"
+                    ),
+                    th.Property(
+                        "read_isolation",
+                        th.StringType,
+                        allowed_values=[
+                            "snapshot",
+                            "read_committed_snapshot",
+                            "read_uncommitted"
+                        ],
+                        description="The isolation level the table is read at"
+                    ),
+                    th.Property(
+                        "query_hints",
+                        th.ArrayType(th.StringType),
+                        description="Hints added to the table's queries"
+                    )
+                )
+            ),
+            description="read_isolation and query_hints for single tables"
+        ),
+        th.Property(
+            "change_tracking_tables",
+            th.ArrayType(th.StringType),
+            description="The tap_stream_ids of tables synced with SQL Server "\
+                        "Change Tracking example: dbo-Sales"
+        ),
+        th.Property(
+            "cdc_tables",
+            th.ArrayType(
+                th.ObjectType(
+                    th.Property(
+                        "table",
+                        th.StringType,
+                        description="The tap_stream_id of the table example: dbo-Sales"
+                    ),
+                    th.Property(
+                        "capture_instance",
+                        th.StringType,
+                        description="The CDC capture instance, defaults to schema_table"
+                    )
+                )
+            ),
+            description="Tables synced from SQL Server CDC capture tables"
+        ),
+        th.Property(
+            "keyset_page_size",
+            th.IntegerType,
+            description="Read incremental and CDC streams in pages of this many rows "\
+                        "with a STATE message after each page"
+        ),
+        th.Property(
+            "resumable_full_table",
+            th.BooleanType,
+            default=False,
+            description="Read full table streams in primary key order and resume "\
+                        "an interrupted read after the last primary key synced"
+        ),
+        th.Property(
+            "max_concurrent_streams",
+            th.IntegerType,
+            default=1,
+            description="The number of streams synced at the same time by the tap-mssql command"
+        ),
+        th.Property(
+            "discovery_cache_dir",
+            th.StringType,
+            description="A directory to cache discovered tables in, "\
+                        "only changed tables are discovered again"
+        ),
+        th.Property(
+            "bulk_discovery",
+            th.BooleanType,
+            default=False,
+            description="Discover the columns and keys of all tables "\
+                        "with a few set-based queries"
+        ),
+        th.Property(
+            "json_serializer",
+            th.StringType,
+            default="auto",
+            allowed_values=["auto", "json", "orjson"],
+            description="The JSON encoder for records and batch files: json, orjson, "\
+                        "or auto to use orjson when installed"
+        ),
+        th.Property(
+            "lob_policies",
+            th.ArrayType(
+                th.ObjectType(
+                    th.Property(
+                        "table",
+                        th.StringType,
+                        description="The tap_stream_id of the table example: dbo-Documents"
+                    ),
+                    th.Property(
+                        "column",
+                        th.StringType,
+                        description="The LOB column"
+                    ),
+                    th.Property(
+                        "policy",
+                        th.StringType,
+                        allowed_values=["skip", "truncate", "hash", "file"],
+                        description="skip the column, truncate it to max_length, "\
+                                    "sync its SHA2_256 hash, or write it to a file "\
+                                    "in lob_dir and sync the path"
+                    ),
+                    th.Property(
+                        "max_length",
+                        th.IntegerType,
+                        description="The characters or bytes truncated values "\
+                                    "are cut to, default 1048576"
+                    )
+                )
+            ),
+            description="How large VARCHAR(MAX), NVARCHAR(MAX), VARBINARY(MAX), "\
+                        "XML, TEXT, NTEXT, and IMAGE columns are synced"
+        ),
+        th.Property(
+            "lob_dir",
+            th.StringType,
+            default="lobs",
+            description="The directory LOB columns with the file policy are written to"
+        ),
+        th.Property(
+            "row_filters",
+            th.ArrayType(
+                th.ObjectType(
+                    th.Property(
+                        "table",
+                        th.StringType,
+                        description="The tap_stream_id of the table example: dbo-Audit"
+                    ),
+                    th.Property(
+                        "where",
+                        th.StringType,
+                        description="A SQL predicate on the table's columns "\
+                                    "example: AuditDate >= DATEADD(year, -2, GETDATE())"
+                    )
+                )
+            ),
+            description="SQL WHERE predicates limiting the rows read from a table, "\
+                        "changes of Change Tracking and CDC streams are not filtered"
+        ),
+        th.Property(
+            "computed_columns",
+            th.ArrayType(
+                th.ObjectType(
+                    th.Property(
+                        "table",
+                        th.StringType,
+                        description="The tap_stream_id of the table example: dbo-Sales"
+                    ),
+                    th.Property(
+                        "column",
+                        th.StringType,
+                        description="The name of the column, a table column "\
+                                    "of the same name is replaced"
+                    ),
+                    th.Property(
+                        "expression",
+                        th.StringType,
+                        description="A SQL expression on the table's columns "\
+                                    "example: CAST(Amount * Rate AS DECIMAL(19, 4))"
+                    ),
+                    th.Property(
+                        "type",
+                        th.StringType,
+                        allowed_values=[
+                            "string", "integer", "number", "boolean", "date-time", "date"
+                        ],
+                        description="The JSON schema type of the values, default string"
+                    )
+                )
+            ),
+            description="Columns selected as SQL expressions, not for Change Tracking "\
+                        "and CDC streams or the replication and primary keys"
+        ),
+        th.Property(
+            "stream_metrics",
+            th.BooleanType,
+            default=False,
+            description="Log METRIC lines splitting each stream's sync time into "\
+                        "query, fetch, transform, serialize, compress, and write"
+        ),
+        th.Property(
+            "metrics_file",
+            th.StringType,
+            description="Write the sync time breakdown of all streams to this file"
+        ),
+        th.Property(
+            "metrics_file_format",
+            th.StringType,
+            default="json",
+            allowed_values=["json", "prometheus"],
+            description="The format of metrics_file: a JSON summary or the "\
+                        "Prometheus text format"
+        ),
+        th.Property(
+            "profiler",
+            th.StringType,
+            allowed_values=list(PROFILERS),
+            description="Profile each stream's sync with cprofile or py-spy"
+        ),
+        th.Property(
+            "profile_dir",
+            th.StringType,
+            default="profiles",
+            description="The directory stream profiles are written to"
+        ),
+        th.Property(
+            "native_type_conversion",
+            th.BooleanType,
+            default=False,
+            description="Convert date, time, uniqueidentifier, and varbinary "\
+                        "values to strings in SQL Server and the driver "\
+                        "instead of in Python"
+        ),
     ).to_dict()
 
     def discover_streams(self) -> list[SQLStream]:
@@ -206,5 +695,101 @@ class Tapmssql(SQLTap):
 
         return result
 
+    @classmethod
+    def invoke(
+        cls,
+        *,
+        about: bool = False,
+        about_format: str | None = None,
+        config: tuple[str, ...] = (),
+        state: str | None = None,
+        catalog: str | None = None,
+    ) -> None:
+        """Invoke the tap's command line interface.
+
+        This is Tap.invoke() with the streams synced by sync_streams().
+
+        Args:
+            about: Display package metadata and settings.
+            about_format: Specify output style for `--about`.
+            config: Configuration file location or 'ENV' to use environment
+                variables. Accepts multiple inputs as a tuple.
+            state: Use a bookmarks file for incremental replication.
+            catalog: Use a Singer catalog file with the tap.
+        """
+        # PluginBase.invoke() handles --about, Tap.invoke() would sync
+        super(Tap, cls).invoke(about=about, about_format=about_format)
+        cls.print_version(print_fn=cls.logger.info)
+        config_files, parse_env_config = cls.config_from_cli_args(*config)
+
+        tap = cls(
+            config=config_files,  # type: ignore[arg-type]
+            state=state,
+            catalog=catalog,
+            parse_env_config=parse_env_config,
+            validate_config=True,
+        )
+        tap.sync_streams()
+
+    def sync_streams(self) -> None:
+        """Sync all streams, like sync_all().
+
+        When `max_concurrent_streams` is above one the selected streams
+        are synced at the same time on a pool of threads. Each stream
+        runs its queries on its own pooled connection. A shared sync lock
+        keeps state updates and Singer messages from interleaving, and
+        is only released while a stream waits on SQL Server.
+
+        The command line syncs with this method. Calling sync_all()
+        directly syncs the streams one at a time, which the streams
+        log a warning for.
+        """
+        max_concurrent_streams = self.config.get('max_concurrent_streams', 1)
+        if max_concurrent_streams < 2:
+            self.sync_all()
+            return
+
+        self._reset_state_progress_markers()
+        self._set_compatible_replication_methods()
+        write_message(StateMessage(value=self.state))
+
+        sync_lock = threading.Lock()
+        streams: list[SQLStream] = []
+        for stream in self.streams.values():
+            if not stream.selected and not stream.has_selected_descendents:
+                self.logger.info("Skipping deselected stream '%s'.", stream.name)
+                continue
+            if stream.parent_stream_type:
+                # Child streams are synced by their parent stream
+                continue
+            stream.sync_lock = sync_lock
+            streams.append(stream)
+
+        def sync_stream(stream: SQLStream) -> None:
+            with sync_lock:
+                stream.sync()
+                stream.finalize_state_progress_markers()
+                stream._write_state_message()
+
+        # Create the engine before the threads ask for it
+        self.tap_connector._engine
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_concurrent_streams) as executor:
+                futures = [executor.submit(sync_stream, stream) for stream in streams]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                finally:
+                    for future in futures:
+                        future.cancel()
+
+            for stream in self.streams.values():
+                stream.log_sync_costs()
+        finally:
+            # A later sync of the stream must not release the lock
+            for stream in streams:
+                stream.sync_lock = None
+
 if __name__ == "__main__":
     Tapmssql.cli()
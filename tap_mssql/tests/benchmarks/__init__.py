@@ -0,0 +1,6 @@
+"""Micro-benchmarks for tap-mssql hot paths.
+
+These are not collected by pytest. Run a benchmark as a module:
+
+    poetry run python -m tap_mssql.tests.benchmarks.bench_row_transform
+"""
@@ -0,0 +1,351 @@
+"""Benchmark extraction end to end against a SQLite stand-in database.
+
+Synthetic narrow, wide, LOB-heavy, and decimal-heavy tables are written
+to a SQLite file and read through a mssqlConnector bound to it, so
+stream_rows(), get_records(), post_process(), JSONLinesBatcher, and the
+RECORD message serializer run as they do in a sync. Only SQL Server's
+network and server time are left out.
+
+Each stage runs in its own process so its peak RSS is its own:
+
+- get_records: rows read and converted to records.
+- post_process: rows read and converted through the post_process() dict path.
+- batch: records written to gzipped JSON Lines batch files.
+- messages: records written as RECORD messages.
+
+MB/s is the JSON size of the table's records over the stage's time.
+Results can be saved and compared to a saved baseline to catch
+regressions:
+
+    poetry run python -m tap_mssql.tests.benchmarks.bench_extraction --save before.json
+    poetry run python -m tap_mssql.tests.benchmarks.bench_extraction --baseline before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+import warnings
+
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable
+
+import sqlalchemy
+
+from singer_sdk.helpers._batch import BatchConfig
+
+from tap_mssql.client import CustomJSONEncoder, mssqlConnector, mssqlStream
+from tap_mssql.serializers import JSONSerializer
+from tap_mssql.tap import Tapmssql
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STAGES = ("get_records", "post_process", "batch", "messages")
+CONFIG = {
+    "dialect": "mssql",
+    "driver_type": "pymssql",
+    "host": "localhost",
+    "user": "benchmark",
+    "password": "benchmark",
+    "database": "main",
+}
+LOB_SIZE = 64 * 1024
+# Makes the row with the given id for a table
+RowMaker = Callable[[int], dict]
+
+# SQLite stores Decimals as floats, which is fine for timing
+warnings.filterwarnings(
+    "ignore",
+    message="Dialect sqlite",
+    category=sqlalchemy.exc.SAWarning
+)
+
+
+def narrow_table(meta: sqlalchemy.MetaData) -> tuple[sqlalchemy.Table, RowMaker]:
+    """Return a 4 column table and a function making its rows."""
+    table = sqlalchemy.Table(
+        "narrow",
+        meta,
+        sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+        sqlalchemy.Column("name", sqlalchemy.String(50)),
+        sqlalchemy.Column("quantity", sqlalchemy.Integer),
+        sqlalchemy.Column("updated", sqlalchemy.DateTime),
+    )
+    updated = datetime.datetime(2023, 1, 2, 3, 4, 5, 123000)
+    return table, lambda i: {
+        "id": i,
+        "name": f"name {i}",
+        "quantity": i % 100,
+        "updated": updated,
+    }
+
+
+def wide_table(meta: sqlalchemy.MetaData) -> tuple[sqlalchemy.Table, RowMaker]:
+    """Return a 61 column table of mixed types and a function making its rows."""
+    columns = [sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True)]
+    values = {}
+    for i in range(60):
+        kind = i % 6
+        if kind == 0:
+            columns.append(sqlalchemy.Column(f"c{i}", sqlalchemy.DateTime))
+            values[f"c{i}"] = datetime.datetime(2023, 1, 2, 3, 4, 5)
+        elif kind == 1:
+            columns.append(sqlalchemy.Column(f"c{i}", sqlalchemy.Date))
+            values[f"c{i}"] = datetime.date(2023, 1, 2)
+        elif kind == 2:
+            columns.append(sqlalchemy.Column(f"c{i}", sqlalchemy.Numeric(18, 4)))
+            values[f"c{i}"] = Decimal("12345.6789")
+        elif kind == 3:
+            columns.append(sqlalchemy.Column(f"c{i}", sqlalchemy.LargeBinary))
+            values[f"c{i}"] = b"\x00\x01\x02\x03\x04\x05\x06\x07"
+        elif kind == 4:
+            columns.append(sqlalchemy.Column(f"c{i}", sqlalchemy.Integer))
+            values[f"c{i}"] = 123456
+        else:
+            columns.append(sqlalchemy.Column(f"c{i}", sqlalchemy.String(100)))
+            values[f"c{i}"] = "Bodega Ilha Ægir"
+    table = sqlalchemy.Table("wide", meta, *columns)
+    return table, lambda i: dict(values, id=i)
+
+
+def lob_table(meta: sqlalchemy.MetaData) -> tuple[sqlalchemy.Table, RowMaker]:
+    """Return a table with 64 KiB text and binary values and a function making its rows."""
+    table = sqlalchemy.Table(
+        "lob",
+        meta,
+        sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+        sqlalchemy.Column("body", sqlalchemy.Text),
+        sqlalchemy.Column("data", sqlalchemy.LargeBinary),
+    )
+    body = "x" * LOB_SIZE
+    data = bytes(range(256)) * (LOB_SIZE // 256)
+    return table, lambda i: {"id": i, "body": body, "data": data}
+
+
+def decimal_table(meta: sqlalchemy.MetaData) -> tuple[sqlalchemy.Table, RowMaker]:
+    """Return a table of 20 DECIMAL columns and a function making its rows."""
+    columns = [sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True)]
+    columns.extend(
+        sqlalchemy.Column(f"amount{i}", sqlalchemy.Numeric(18, 4)) for i in range(20)
+    )
+    table = sqlalchemy.Table("decimals", meta, *columns)
+    return table, lambda i: {
+        "id": i,
+        **{f"amount{j}": Decimal(i * 31 + j).scaleb(-4) for j in range(20)},
+    }
+
+
+# Table builders and their default row counts
+SCENARIOS = {
+    "narrow": (narrow_table, 200000),
+    "wide": (wide_table, 20000),
+    "lob": (lob_table, 1000),
+    "decimal": (decimal_table, 100000),
+}
+
+
+def build_database(path: Path, scenario: str, rows: int) -> None:
+    """Write a scenario's table to a SQLite file."""
+    engine = sqlalchemy.create_engine(f"sqlite:///{path}")
+    meta = sqlalchemy.MetaData()
+    table, make_row = SCENARIOS[scenario][0](meta)
+    meta.create_all(engine)
+    with engine.begin() as conn:
+        for start in range(0, rows, 10000):
+            conn.execute(
+                table.insert(),
+                [make_row(i) for i in range(start, min(start + 10000, rows))]
+            )
+    engine.dispose()
+
+
+def make_stream(path: Path, config: dict) -> mssqlStream:
+    """Return the stream of the only table in a SQLite file, all columns selected."""
+    config = dict(CONFIG, **config)
+    connector = mssqlConnector(config=config, sqlalchemy_url=f"sqlite:///{path}")
+    catalog_entries = connector.discover_catalog_entries()
+    for catalog_entry in catalog_entries:
+        for metadata in catalog_entry["metadata"]:
+            metadata["metadata"]["selected"] = True
+    tap = Tapmssql(
+        config=config,
+        catalog={"streams": catalog_entries},
+        parse_env_config=False,
+        validate_config=False,
+    )
+    tap._tap_connector = connector
+    return next(iter(tap.streams.values()))
+
+
+def json_size(path: Path, config: dict) -> int:
+    """Return the size of a table's records as JSON Lines."""
+    serializer = JSONSerializer(CustomJSONEncoder)
+    return sum(
+        len(serializer.encode_lines([record]))
+        for record in make_stream(path, config).get_records(None)
+    )
+
+
+class CountingWriter:
+    """A stdout stand-in that only counts what is written."""
+
+    def __init__(self) -> None:
+        """Class Default Init"""
+        self.size = 0
+
+    def write(self, text: str) -> int:
+        """Count written text."""
+        self.size += len(text)
+        return len(text)
+
+    def flush(self) -> None:
+        """Do nothing."""
+
+
+def peak_rss_mb() -> float | None:
+    """Return the peak resident set size of this process in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 1e6 if sys.platform == "darwin" else peak * 1024 / 1e6
+
+
+def run_stage(path: Path, stage: str, config: dict, batch_dir: str) -> dict:
+    """Run one stage on a fresh stream and return its row count, time, and peak RSS."""
+    stream = make_stream(path, config)
+    rows = 0
+    start = time.perf_counter()
+    if stage == "get_records":
+        for _ in stream.get_records(None):
+            rows += 1
+    elif stage == "post_process":
+        table = stream.connector.get_table(stream.fully_qualified_name)
+        column_names = list(table.columns.keys())
+        fetch_size = stream.config.get("fetch_size", 10000)
+        for batch in stream.connector.stream_rows(table.select(), fetch_size):
+            for row in batch:
+                stream.post_process(dict(zip(column_names, row)))
+                rows += 1
+    elif stage == "batch":
+        batch_config = BatchConfig.from_dict(
+            {
+                "encoding": {"format": "jsonl", "compression": "gzip"},
+                "storage": {"root": f"file://{batch_dir}"},
+                "batch_size": 10000,
+            }
+        )
+        # The rows are counted by the caller
+        for _ in stream.get_batches(batch_config):
+            pass
+    else:
+        stdout = sys.stdout
+        sys.stdout = CountingWriter()
+        try:
+            for record in stream.get_records(None):
+                stream._write_record_message(record)
+                rows += 1
+        finally:
+            sys.stdout = stdout
+    return {
+        "rows": rows,
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run(scenarios: list[str], scale: float, config: dict) -> dict:
+    """Run every stage of the scenarios and return their results."""
+    results = {}
+    spawn = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scenario in scenarios:
+            rows = max(int(SCENARIOS[scenario][1] * scale), 1)
+            path = Path(tmp, f"{scenario}.db")
+            build_database(path, scenario, rows)
+            size = json_size(path, config)
+            print(f"{scenario}: {rows:,} rows, {size / 1e6:,.1f} MB of JSON")
+
+            for stage in STAGES:
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+                    result = executor.submit(run_stage, path, stage, config, tmp).result()
+                result["rows"] = result["rows"] or rows
+                result["rows_per_second"] = result["rows"] / result["seconds"]
+                result["mb_per_second"] = size / 1e6 / result["seconds"]
+                results[f"{scenario}.{stage}"] = result
+                peak = result["peak_rss_mb"]
+                print(
+                    f"  {stage:<14}{result['rows_per_second']:>14,.0f} rows/s"
+                    f"{result['mb_per_second']:>10,.1f} MB/s"
+                    + (f"{peak:>10,.0f} MB peak RSS" if peak is not None else "")
+                )
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return the stages that got slower than the baseline by more than the tolerance."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        change = result["rows_per_second"] / before["rows_per_second"] - 1
+        if change < -tolerance:
+            regressions.append(f"{name}: {change:+.1%} rows/s")
+    return regressions
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=list(SCENARIOS),
+        help="A scenario to run, all when not given",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiply the default row counts",
+    )
+    parser.add_argument(
+        "--config",
+        type=json.loads,
+        default={},
+        help='Tap config to run with as JSON, e.g. \'{"json_serializer": "json"}\'',
+    )
+    parser.add_argument("--save", type=Path, help="Write the results to a JSON file")
+    parser.add_argument("--baseline", type=Path, help="Compare to saved results")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="The rows/s drop from the baseline reported as a regression",
+    )
+    args = parser.parse_args()
+
+    results = run(args.scenario or list(SCENARIOS), args.scale, args.config)
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
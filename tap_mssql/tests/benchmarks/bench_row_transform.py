@@ -0,0 +1,100 @@
+"""Benchmark dict(row._mapping) + post_process against the row tuple fast path.
+
+Rows come from an in-memory SQLite table with 50 columns so the
+SQLAlchemy Row objects are the same kind get_records() receives.
+"""
+
+from __future__ import annotations
+
+import datetime
+import time
+
+from types import SimpleNamespace
+
+import sqlalchemy
+
+from tap_mssql.client import (
+    build_row_converters,
+    build_row_transformer,
+    mssqlStream,
+)
+
+COLUMNS = 50
+ROWS = 100000
+
+
+def make_rows() -> tuple[list[str], list, dict]:
+    """Return column names, SQLAlchemy rows, and a schema for a wide table."""
+    engine = sqlalchemy.create_engine("sqlite://")
+    meta = sqlalchemy.MetaData()
+    columns = []
+    properties = {}
+    for i in range(COLUMNS):
+        if i % 10 == 0:
+            columns.append(sqlalchemy.Column(f"c{i}", sqlalchemy.DateTime))
+            properties[f"c{i}"] = {"type": ["string"], "format": "date-time"}
+        elif i % 10 == 1:
+            columns.append(sqlalchemy.Column(f"c{i}", sqlalchemy.LargeBinary))
+            properties[f"c{i}"] = {"type": ["string"], "contentEncoding": "base64"}
+        elif i % 2:
+            columns.append(sqlalchemy.Column(f"c{i}", sqlalchemy.Integer))
+            properties[f"c{i}"] = {"type": ["integer"]}
+        else:
+            columns.append(sqlalchemy.Column(f"c{i}", sqlalchemy.String(20)))
+            properties[f"c{i}"] = {"type": ["string"], "maxLength": 20}
+    table = sqlalchemy.Table("wide", meta, *columns)
+    meta.create_all(engine)
+
+    now = datetime.datetime(2023, 1, 2, 3, 4, 5)
+    row = {}
+    for column in columns:
+        if isinstance(column.type, sqlalchemy.DateTime):
+            row[column.name] = now
+        elif isinstance(column.type, sqlalchemy.LargeBinary):
+            row[column.name] = b"\x00\x01\x02\x03"
+        elif isinstance(column.type, sqlalchemy.Integer):
+            row[column.name] = 12345
+        else:
+            row[column.name] = "some text"
+
+    with engine.begin() as conn:
+        conn.execute(table.insert(), [row] * 1000)
+        rows = conn.execute(table.select()).fetchall()
+
+    column_names = [column.name for column in columns]
+    return column_names, rows * (ROWS // len(rows)), {"properties": properties}
+
+
+def run(label: str, rows: list, transform) -> float:
+    """Time a transform over every row and print rows per second."""
+    start = time.perf_counter()
+    for row in rows:
+        transform(row)
+    elapsed = time.perf_counter() - start
+    rows_per_second = len(rows) / elapsed
+    print(f"{label:<32}{rows_per_second:>14,.0f} rows/s")
+    return rows_per_second
+
+
+def main() -> None:
+    """Run the benchmark."""
+    column_names, rows, schema = make_rows()
+    row_converters = build_row_converters(schema)
+    stream = SimpleNamespace(row_converters=row_converters)
+
+    print(f"{len(rows):,} rows x {COLUMNS} columns")
+    before = run(
+        "dict(row._mapping) + post_process",
+        rows,
+        lambda row: mssqlStream.post_process(stream, dict(row._mapping))
+    )
+    after = run(
+        "row tuple fast path",
+        rows,
+        build_row_transformer(column_names, row_converters)
+    )
+    print(f"speedup: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
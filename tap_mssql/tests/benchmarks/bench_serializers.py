@@ -0,0 +1,107 @@
+"""Benchmark the json and orjson serializers on SQL Server shaped rows.
+
+Batch lines are encoded from rows as post_process() leaves them and
+RECORD messages from rows as the SDK conforms them, with the
+DECIMAL, DATETIME2, TIME, UNIQUEIDENTIFIER, BIT, and NVARCHAR values
+a typical table holds. orjson is only timed when it is installed.
+"""
+
+from __future__ import annotations
+
+import datetime
+import time
+
+from decimal import Decimal
+from uuid import UUID
+
+from tap_mssql.client import CustomJSONEncoder
+from tap_mssql.serializers import JSONSerializer, get_serializer, orjson
+
+ROWS = 100000
+BATCH_SIZE = 10000
+
+
+def make_row(i: int) -> dict:
+    """Return a row as post_process() leaves it for a batch file."""
+    return {
+        "OrderID": i,
+        "CustomerID": UUID(int=i),
+        "OrderDate": "2023-01-02T03:04:05.123000",
+        "ShipTime": datetime.time(13, 30, 0, 250000),
+        "Amount": Decimal("12345.6789"),
+        "Discount": Decimal("0.10"),
+        "Quantity": 17,
+        "Shipped": True,
+        "ShipName": "Bodega Ilha Ægir",
+        "Comment": None,
+    }
+
+
+def make_message(row: dict) -> dict:
+    """Return a RECORD message as the SDK writes it for a row."""
+    record = dict(row, CustomerID=str(row["CustomerID"]), ShipTime=str(row["ShipTime"]))
+    return {
+        "type": "RECORD",
+        "stream": "dbo-Orders",
+        "record": record,
+        "time_extracted": datetime.datetime(
+            2023, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc
+        ),
+    }
+
+
+def run(label: str, rows: list, encode) -> float:
+    """Time an encode function over every row and print rows and MB per second."""
+    start = time.perf_counter()
+    size = encode(rows)
+    elapsed = time.perf_counter() - start
+    rows_per_second = len(rows) / elapsed
+    print(
+        f"{label:<32}{rows_per_second:>14,.0f} rows/s"
+        f"{size / elapsed / 1e6:>10,.1f} MB/s"
+    )
+    return rows_per_second
+
+
+def batch_lines(serializer: JSONSerializer):
+    """Return a function encoding rows in batch sized chunks."""
+    def encode(rows: list) -> int:
+        return sum(
+            len(serializer.encode_lines(rows[i:i + BATCH_SIZE]))
+            for i in range(0, len(rows), BATCH_SIZE)
+        )
+    return encode
+
+
+def messages(serializer: JSONSerializer):
+    """Return a function encoding each message."""
+    def encode(messages: list) -> int:
+        format_message = serializer.format_message
+        return sum(len(format_message(message)) for message in messages)
+    return encode
+
+
+def main() -> None:
+    """Run the benchmark."""
+    rows = [make_row(i) for i in range(ROWS)]
+    record_messages = [make_message(row) for row in rows]
+    json_serializer = JSONSerializer(CustomJSONEncoder)
+
+    print(f"{ROWS:,} rows x {len(rows[0])} columns")
+    before = run("json batch lines", rows, batch_lines(json_serializer))
+    if orjson is None:
+        print("orjson is not installed")
+        return
+    orjson_serializer = get_serializer("orjson", CustomJSONEncoder)
+    after = run("orjson batch lines", rows, batch_lines(orjson_serializer))
+    print(f"speedup: {after / before:.2f}x")
+
+    before = run("json RECORD messages", record_messages, messages(json_serializer))
+    after = run("orjson RECORD messages", record_messages, messages(orjson_serializer))
+    print(f"speedup: {after / before:.2f}x")
+    if not hasattr(orjson, "Fragment"):
+        print("orjson.Fragment needs orjson 3.9, messages with Decimals used json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark discovery of a synthetic 10k column catalog.
+
+Columns are served by a mssqlBulkInspector filled in memory so only
+the catalog building and SQL type to JSON Schema mapping are timed.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+from sqlalchemy.dialects import mssql
+
+from tap_mssql.client import mssqlBulkInspector, mssqlConnector
+
+TABLES = 500
+COLUMNS_PER_TABLE = 20
+
+COLUMN_TYPES = [
+    lambda: mssql.INTEGER(),
+    lambda: mssql.BIGINT(),
+    lambda: mssql.BIT(),
+    lambda: mssql.DATETIME2(),
+    lambda: mssql.DATE(),
+    lambda: mssql.UNIQUEIDENTIFIER(),
+    lambda: mssql.NVARCHAR(random.choice([50, 100, 255, None])),
+    lambda: mssql.VARCHAR(random.choice([10, 50, 8000])),
+    lambda: mssql.DECIMAL(random.choice([10, 18, 38]), random.choice([0, 2, 4])),
+    lambda: mssql.NUMERIC(random.choice([9, 19]), random.choice([0, 6])),
+    lambda: mssql.MONEY(),
+    lambda: mssql.VARBINARY(random.choice([16, None])),
+]
+
+
+def make_inspector() -> mssqlBulkInspector:
+    """Return a bulk inspector holding a synthetic catalog."""
+    random.seed(0)
+    inspector = mssqlBulkInspector.__new__(mssqlBulkInspector)
+    inspector.ischema_names = mssql.dialect.ischema_names
+    inspector.columns = {}
+    inspector.pk_constraints = {}
+    inspector.indexes = {}
+    for table in range(TABLES):
+        inspector.columns[("dbo", f"table_{table}")] = [
+            {"name": "id", "type": mssql.INTEGER(), "nullable": False},
+            *(
+                {
+                    "name": f"column_{column}",
+                    "type": random.choice(COLUMN_TYPES)(),
+                    "nullable": True,
+                }
+                for column in range(1, COLUMNS_PER_TABLE)
+            ),
+        ]
+        inspector.pk_constraints[("dbo", f"table_{table}")] = {
+            "constrained_columns": ["id"],
+            "name": f"pk_table_{table}",
+        }
+    return inspector
+
+
+def discover(connector: mssqlConnector, inspector: mssqlBulkInspector) -> float:
+    """Build every catalog entry and return the seconds it took."""
+    start = time.perf_counter()
+    for _, table_name in inspector.columns:
+        connector.discover_catalog_entry(None, inspector, "dbo", table_name, False)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Run the benchmark."""
+    inspector = make_inspector()
+    print(f"{TABLES * COLUMNS_PER_TABLE:,} columns in {TABLES} tables")
+
+    for hd_jsonschema_types in (False, True):
+        connector = mssqlConnector(
+            config={"hd_jsonschema_types": hd_jsonschema_types},
+            sqlalchemy_url="sqlite://",
+        )
+        mapper = (
+            connector.hd_to_jsonschema_type
+            if hd_jsonschema_types
+            else connector.org_to_jsonschema_type
+        )
+
+        # Map every column without the cache
+        connector.to_jsonschema_type = mapper
+        uncached = discover(connector, inspector)
+        del connector.to_jsonschema_type
+
+        mssqlConnector.jsonschema_type_cache.clear()
+        cached = discover(connector, inspector)
+
+        print(
+            f"hd_jsonschema_types={hd_jsonschema_types!s:<6}"
+            f"uncached {uncached:.3f}s  cached {cached:.3f}s  "
+            f"speedup {uncached / cached:.2f}x  "
+            f"({len(mssqlConnector.jsonschema_type_cache)} distinct types)"
+        )
+
+
+if __name__ == "__main__":
+    main()
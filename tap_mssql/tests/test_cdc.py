@@ -0,0 +1,163 @@
+"""Tests CDC syncs against a fake capture function on SQLite."""
+
+import json
+
+import sqlalchemy
+
+from tap_mssql.client import CDC_ORDER_COLUMNS, mssqlConnector, mssqlStream
+from tap_mssql.tap import Tapmssql
+
+
+def lsn(value: int) -> bytes:
+    """Return a binary(10) LSN."""
+    return value.to_bytes(10, "big")
+
+
+# (__$start_lsn, __$seqval, __$operation, id, amount)
+CHANGES = [
+    (lsn(1), lsn(1), 2, 1, 5),
+    (lsn(2), lsn(1), 2, 2, 10),
+    (lsn(2), lsn(2), 2, 3, 30),
+    (lsn(3), lsn(1), 4, 2, 20),
+    (lsn(4), lsn(1), 1, 3, 30),
+    (lsn(5), lsn(1), 2, 4, 40),
+]
+
+
+def test_cdc_sync(tmp_path, monkeypatch, capsys):
+    """Changes after the saved LSN are synced in order, deletes marked."""
+    db_path = tmp_path / "cdc.db"
+    engine = sqlalchemy.create_engine(f"sqlite:///{db_path}")
+    meta = sqlalchemy.MetaData()
+    sqlalchemy.Table(
+        "orders",
+        meta,
+        sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+        sqlalchemy.Column("amount", sqlalchemy.Integer),
+    )
+    fake_changes = sqlalchemy.Table(
+        "fake_changes",
+        meta,
+        *[sqlalchemy.Column(name, sqlalchemy.LargeBinary) for name in CDC_ORDER_COLUMNS[:2]],
+        sqlalchemy.Column(CDC_ORDER_COLUMNS[2], sqlalchemy.Integer),
+        sqlalchemy.Column("id", sqlalchemy.Integer),
+        sqlalchemy.Column("amount", sqlalchemy.Integer),
+    )
+    meta.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            fake_changes.insert(),
+            [dict(zip(fake_changes.columns.keys(), change)) for change in CHANGES]
+        )
+
+    config = {
+        "driver_type": "pymssql",
+        "host": "localhost",
+        "user": "user",
+        "password": "password",
+        "database": "test",
+        "cdc_tables": [{"table": "main-orders"}],
+        "keyset_page_size": 2,
+    }
+    connector = mssqlConnector(config=config, sqlalchemy_url=f"sqlite:///{db_path}")
+    catalog_entries = [
+        catalog_entry
+        for catalog_entry in connector.discover_catalog_entries()
+        if catalog_entry["tap_stream_id"] == "main-orders"
+    ]
+    for catalog_entry in catalog_entries:
+        Tapmssql.add_deleted_at_property(catalog_entry)
+        for metadata in catalog_entry["metadata"]:
+            metadata["metadata"]["selected"] = True
+
+    def fake_get_cdc_changes(self, table, last_lsn, max_lsn):
+        return sqlalchemy.select(fake_changes).where(
+            fake_changes.c["__$start_lsn"] > last_lsn,
+            fake_changes.c["__$start_lsn"] <= max_lsn,
+        ).subquery("changes")
+
+    monkeypatch.setattr(mssqlStream, "get_cdc_changes", fake_get_cdc_changes)
+    monkeypatch.setattr(
+        mssqlConnector,
+        "get_cdc_lsn_range",
+        lambda self, capture_instance: (lsn(1), lsn(5))
+    )
+
+    tap = Tapmssql(
+        config=config,
+        catalog={"streams": catalog_entries},
+        state={"bookmarks": {"main-orders": {"cdc_lsn": lsn(1).hex()}}},
+        parse_env_config=False,
+        validate_config=False,
+    )
+    tap._tap_connector = connector
+    tap.sync_all()
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    records = [
+        (
+            message["record"]["id"],
+            message["record"]["amount"],
+            message["record"]["_sdc_deleted_at"] is not None
+        )
+        for message in messages if message["type"] == "RECORD"
+    ]
+    assert records == [
+        (2, 10, False),
+        (3, 30, False),
+        (2, 20, False),
+        (3, 30, True),
+        (4, 40, False),
+    ]
+
+    cdc_lsns = [
+        message["value"]["bookmarks"]["main-orders"].get("cdc_lsn")
+        for message in messages if message["type"] == "STATE"
+    ]
+    # The first page ends inside the LSN 2 transaction so it has no
+    # checkpoint, the second page ends inside LSN 4
+    assert cdc_lsns == [lsn(1).hex(), lsn(3).hex(), lsn(5).hex()]
+
+
+def test_deleted_at_only_changes_tracked_tables(tmp_path, monkeypatch):
+    """Tracked tables' columns become nullable, untracked ones with the same types don't."""
+    db_path = tmp_path / "cdc.db"
+    engine = sqlalchemy.create_engine(f"sqlite:///{db_path}")
+    meta = sqlalchemy.MetaData()
+    for name in ("orders", "customers"):
+        sqlalchemy.Table(
+            name,
+            meta,
+            sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column("amount", sqlalchemy.Integer, nullable=False),
+        )
+    meta.create_all(engine)
+
+    config = {
+        "driver_type": "pymssql",
+        "host": "localhost",
+        "user": "user",
+        "password": "password",
+        "database": "test",
+        "change_tracking_tables": ["main-orders"],
+    }
+    connector = mssqlConnector(config=config, sqlalchemy_url=f"sqlite:///{db_path}")
+    monkeypatch.setattr(Tapmssql, "_tap_connector", connector)
+    tap = Tapmssql(config=config, parse_env_config=False, validate_config=False)
+    schemas = {
+        catalog_entry["tap_stream_id"]: catalog_entry["schema"]["properties"]
+        for catalog_entry in tap.catalog_dict["streams"]
+    }
+
+    assert schemas["main-orders"]["amount"]["type"] == ["integer", "null"]
+    assert "_sdc_deleted_at" in schemas["main-orders"]
+    assert schemas["main-customers"]["amount"]["type"] == ["integer"]
+    assert schemas["main-customers"]["id"]["type"] == ["integer"]
+    assert connector.to_jsonschema_type(sqlalchemy.Integer())["type"] == ["integer"]
+
+    # Entries that share a type list are not changed through it
+    types = ["integer"]
+    tracked = {"schema": {"properties": {"amount": {"type": types}}}, "metadata": []}
+    Tapmssql.add_deleted_at_property(tracked)
+    assert tracked["schema"]["properties"]["amount"]["type"] == ["integer", "null"]
+    assert types == ["integer"]
@@ -0,0 +1,718 @@
+"""Tests the client helpers that don't need a SQL Server."""
+
+import datetime
+import gzip
+import json
+import time
+
+from types import SimpleNamespace
+
+import pytest
+import sqlalchemy
+
+from singer_sdk.helpers._batch import BatchConfig
+from sqlalchemy.dialects import mssql
+
+from tap_mssql.client import (
+    AdaptiveBatchSize,
+    binary_to_base64,
+    build_arrow_schema,
+    build_native_query,
+    build_row_converters,
+    build_row_transformer,
+    date_to_isoformat,
+    estimate_record_size,
+    from_bookmark_value,
+    JSONLinesBatcher,
+    keyset_predicate,
+    to_arrow_type,
+    write_arrow_file,
+    mssqlBulkInspector,
+    mssqlConnector,
+    mssqlStream,
+    pool_capacity,
+    prefetch_batches,
+    RowVersion,
+)
+from tap_mssql.tap import Tapmssql
+
+SAMPLE_SCHEMA = {
+    "properties": {
+        "id": {"type": ["integer"]},
+        "name": {"type": ["string"], "maxLength": 50},
+        "created": {"type": ["string"], "format": "date-time"},
+        "birthday": {"type": ["string"], "format": "date"},
+        "photo": {"type": ["string"], "contentEncoding": "base64"},
+    }
+}
+
+
+def test_build_row_converters():
+    """Only the columns that need converting get a converter."""
+    assert build_row_converters(SAMPLE_SCHEMA) == [
+        ("created", date_to_isoformat),
+        ("birthday", date_to_isoformat),
+        ("photo", binary_to_base64),
+    ]
+
+
+def test_row_converters_output():
+    """Converters match the ISO and base64 output of post_process."""
+    assert date_to_isoformat(
+        datetime.datetime(2023, 1, 2, 3, 4, 5)
+    ) == "2023-01-02T03:04:05"
+    assert date_to_isoformat(datetime.date(2023, 1, 2)) == "2023-01-02"
+    assert date_to_isoformat(b"\x00") == b"\x00"
+    assert binary_to_base64(b"\x00\x01") == "AAE="
+
+
+def test_build_row_transformer():
+    """Row tuples become records with the converters applied."""
+    transform = build_row_transformer(
+        ["id", "created", "photo"],
+        build_row_converters(SAMPLE_SCHEMA)
+    )
+    assert transform((1, datetime.date(2023, 1, 2), None)) == {
+        "id": 1,
+        "created": "2023-01-02",
+        "photo": None,
+    }
+    assert transform((2, None, b"\x00\x01")) == {
+        "id": 2,
+        "created": None,
+        "photo": "AAE=",
+    }
+
+
+def test_stream_rows(tmp_path):
+    """Rows come back in fetch_size batches, in order, with the cursor arraysize set."""
+    db_path = tmp_path / "rows.db"
+    engine = sqlalchemy.create_engine(f"sqlite:///{db_path}")
+    meta = sqlalchemy.MetaData()
+    table = sqlalchemy.Table("t", meta, sqlalchemy.Column("id", sqlalchemy.Integer))
+    meta.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(table.insert(), [{"id": i} for i in range(25)])
+
+    connector = mssqlConnector(
+        config={"driver_type": "pymssql"},
+        sqlalchemy_url=f"sqlite:///{db_path}",
+    )
+    cursors = []
+    sqlalchemy.event.listen(
+        connector._engine,
+        "after_cursor_execute",
+        lambda conn, cursor, *args: cursors.append(cursor)
+    )
+    batches = list(connector.stream_rows(table.select().order_by(table.c.id), 10))
+
+    assert [len(rows) for rows in batches] == [10, 10, 5]
+    assert [row[0] for rows in batches for row in rows] == list(range(25))
+    assert cursors[-1].arraysize == 10
+
+
+def test_keyset_predicate():
+    """Paging on the predicate reads every row once, ties and NULLs included."""
+    engine = sqlalchemy.create_engine("sqlite://")
+    meta = sqlalchemy.MetaData()
+    table = sqlalchemy.Table(
+        "t",
+        meta,
+        sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+        sqlalchemy.Column("updated", sqlalchemy.Integer),
+    )
+    meta.create_all(engine)
+    rows = [{"id": i, "updated": None if i < 3 else i // 4} for i in range(20)]
+    key_columns = [table.c.updated, table.c.id]
+    query = table.select().order_by(*key_columns).limit(3)
+
+    read = []
+    with engine.connect() as conn:
+        conn.execute(table.insert(), rows)
+        page = conn.execute(query).fetchall()
+        while page:
+            read.extend(page)
+            last = page[-1]
+            page = conn.execute(
+                query.where(keyset_predicate(key_columns, [last.updated, last.id]))
+            ).fetchall()
+
+    assert sorted(row.id for row in read) == list(range(20))
+    assert len(read) == 20
+
+
+def test_discovery_cache(tmp_path, monkeypatch):
+    """Only tables with a new modify date are reflected again."""
+    db_path = tmp_path / "discovery.db"
+    engine = sqlalchemy.create_engine(f"sqlite:///{db_path}")
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.text("CREATE TABLE one (id INTEGER PRIMARY KEY)"))
+        conn.execute(sqlalchemy.text("CREATE TABLE two (id INTEGER PRIMARY KEY)"))
+
+    connector = mssqlConnector(
+        config={
+            "driver_type": "pymssql",
+            "host": "localhost",
+            "database": "test",
+            "discovery_cache_dir": str(tmp_path / "cache"),
+        },
+        sqlalchemy_url=f"sqlite:///{db_path}",
+    )
+    modify_dates = {
+        "main": {
+            "one": (False, "2023-01-01T00:00:00"),
+            "two": (False, "2023-01-01T00:00:00"),
+        }
+    }
+    monkeypatch.setattr(connector, "get_object_modify_dates", lambda: modify_dates)
+
+    reflected = []
+    discover_catalog_entry = connector.discover_catalog_entry
+
+    def counting_discover_catalog_entry(engine, inspected, schema, table, is_view):
+        reflected.append(table)
+        return discover_catalog_entry(engine, inspected, schema, table, is_view)
+
+    monkeypatch.setattr(
+        connector,
+        "discover_catalog_entry",
+        counting_discover_catalog_entry
+    )
+
+    first = connector.discover_catalog_entries()
+    assert sorted(reflected) == ["one", "two"]
+
+    reflected.clear()
+    assert connector.discover_catalog_entries() == first
+    assert reflected == []
+
+    modify_dates["main"]["two"] = (False, "2023-02-01T00:00:00")
+    connector.discover_catalog_entries()
+    assert reflected == ["two"]
+
+
+def test_bulk_inspector_column_types():
+    """Bulk discovery builds the same types the inspector reflects."""
+    inspector = mssqlBulkInspector.__new__(mssqlBulkInspector)
+    inspector.ischema_names = mssql.dialect.ischema_names
+
+    nvarchar = inspector.build_column_type("nvarchar", 50, None, None, None)
+    assert isinstance(nvarchar, mssql.NVARCHAR)
+    assert nvarchar.length == 50
+
+    assert inspector.build_column_type("varchar", -1, None, None, None).length is None
+
+    decimal = inspector.build_column_type("decimal", None, 18, 4, None)
+    assert isinstance(decimal, mssql.DECIMAL)
+    assert (decimal.precision, decimal.scale) == (18, 4)
+
+    assert isinstance(
+        inspector.build_column_type("unknown", None, None, None, None),
+        sqlalchemy.types.NullType
+    )
+
+
+def test_to_jsonschema_type_cache():
+    """Types are mapped once per signature and callers get a copy."""
+    connector = mssqlConnector(
+        config={"hd_jsonschema_types": True},
+        sqlalchemy_url="sqlite://",
+    )
+    first = connector.to_jsonschema_type(mssql.DECIMAL(10, 2))
+    assert first == mssqlConnector.hd_to_jsonschema_type(mssql.DECIMAL(10, 2))
+
+    first["maximum"] = 0
+    first["type"].append("null")
+    second = connector.to_jsonschema_type(mssql.DECIMAL(10, 2))
+    assert second["maximum"] == 99999999.99
+    assert "null" not in second["type"]
+    assert connector.to_jsonschema_type(mssql.DECIMAL(10, 0))["type"] == ["integer"]
+
+
+def test_pipelined_batches_keep_order(tmp_path):
+    """Batch files written by workers come back in chunk order."""
+    batch_config = BatchConfig.from_dict(
+        {
+            "encoding": {"format": "jsonl", "compression": "gzip"},
+            "storage": {"root": f"file://{tmp_path}"},
+            "batch_size": 10,
+        }
+    )
+    batcher = JSONLinesBatcher(
+        "tap-mssql",
+        "dbo-test",
+        batch_config,
+        workers=3,
+        compresslevel=1,
+    )
+    records = ({"id": i, "created": datetime.date(2023, 1, 1)} for i in range(95))
+
+    ids = []
+    for manifest in batcher.get_batches(records):
+        with gzip.open(tmp_path / manifest[0].rsplit("/", 1)[-1]) as batch_file:
+            ids.extend(json.loads(line)["id"] for line in batch_file)
+
+    assert ids == list(range(95))
+
+
+def test_to_arrow_type():
+    """SQL types map to Arrow types that keep their values intact."""
+    pyarrow = pytest.importorskip("pyarrow")
+
+    assert to_arrow_type(mssql.TINYINT()) == pyarrow.uint8()
+    assert to_arrow_type(mssql.INTEGER()) == pyarrow.int32()
+    assert to_arrow_type(mssql.DECIMAL(18, 4)) == pyarrow.decimal128(18, 4)
+    assert to_arrow_type(mssql.MONEY()) == pyarrow.decimal128(19, 4)
+    assert to_arrow_type(mssql.DATETIME2()) == pyarrow.timestamp("us")
+    assert to_arrow_type(mssql.DATETIMEOFFSET()) == pyarrow.timestamp("us", tz="UTC")
+    assert to_arrow_type(mssql.TIMESTAMP()) == pyarrow.binary()
+    assert to_arrow_type(RowVersion()) == pyarrow.uint64()
+    assert to_arrow_type(mssql.UNIQUEIDENTIFIER()) == pyarrow.string()
+
+
+def test_arrow_schema_has_deleted_at(tmp_path):
+    """Properties that aren't table columns, like _sdc_deleted_at, are written."""
+    pyarrow = pytest.importorskip("pyarrow")
+    parquet = pytest.importorskip("pyarrow.parquet")
+
+    table = sqlalchemy.Table(
+        "Sales",
+        sqlalchemy.MetaData(),
+        sqlalchemy.Column("id", mssql.INTEGER, nullable=False),
+        sqlalchemy.Column("amount", mssql.MONEY, nullable=False),
+    )
+    catalog_entry = {
+        "key_properties": ["id"],
+        "schema": {
+            "properties": {
+                "id": {"type": ["integer"]},
+                "amount": {"type": ["number"]},
+            }
+        },
+        "metadata": [],
+    }
+    Tapmssql.add_deleted_at_property(catalog_entry)
+    arrow_schema = build_arrow_schema(table.columns, catalog_entry["schema"])
+
+    assert arrow_schema.names == ["id", "amount", "_sdc_deleted_at"]
+    assert arrow_schema.field("_sdc_deleted_at").type == pyarrow.timestamp("us")
+    assert arrow_schema.field("amount").nullable
+    assert not arrow_schema.field("id").nullable
+
+    batch_config = BatchConfig.from_dict(
+        {
+            "encoding": {"format": "parquet"},
+            "storage": {"root": f"file://{tmp_path}"},
+        }
+    )
+    deleted_at = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    path = write_arrow_file(
+        batch_config.storage,
+        "sales.parquet",
+        [{"id": 1, "amount": None, "_sdc_deleted_at": deleted_at}],
+        arrow_schema,
+    )
+    rows = parquet.read_table(path.replace("file://", "")).to_pylist()
+    assert rows == [{"id": 1, "amount": None, "_sdc_deleted_at": deleted_at}]
+
+
+def test_change_tracking_query():
+    """Changed keys are joined back to the table and deletes are marked."""
+    table = sqlalchemy.Table(
+        "Sales",
+        sqlalchemy.MetaData(),
+        sqlalchemy.Column("id", sqlalchemy.Integer),
+        sqlalchemy.Column("amount", sqlalchemy.Integer),
+        schema="dbo",
+    )
+    stream = SimpleNamespace(
+        primary_keys=["id"],
+        schema={"properties": {"_sdc_deleted_at": {}}},
+        connector=SimpleNamespace(_dialect=mssql.dialect()),
+    )
+    query = mssqlStream.get_change_tracking_query(stream, table, 42)
+    sql = str(query.compile(dialect=mssql.dialect()))
+
+    assert list(query.selected_columns.keys()) == ["id", "amount", "_sdc_deleted_at"]
+    assert "FROM CHANGETABLE(CHANGES dbo.[Sales], :CHANGETABLE_1) AS ct" in sql
+    assert "LEFT OUTER JOIN dbo.[Sales] ON dbo.[Sales].id = ct.id" in sql
+    assert sql.endswith("ORDER BY ct.[SYS_CHANGE_VERSION]")
+
+
+def test_add_deleted_at_property():
+    """Change Tracking entries get _sdc_deleted_at and nullable non-key properties."""
+    catalog_entry = {
+        "key_properties": ["id"],
+        "schema": {
+            "properties": {
+                "id": {"type": ["integer"]},
+                "amount": {"type": ["integer"]},
+            }
+        },
+        "metadata": [],
+    }
+    Tapmssql.add_deleted_at_property(catalog_entry)
+
+    properties = catalog_entry["schema"]["properties"]
+    assert properties["id"]["type"] == ["integer"]
+    assert properties["amount"]["type"] == ["integer", "null"]
+    assert properties["_sdc_deleted_at"]["format"] == "date-time"
+    assert catalog_entry["metadata"][0]["breadcrumb"] == ["properties", "_sdc_deleted_at"]
+
+
+def test_rowversion():
+    """Rowversions are read as integers and compared as binary."""
+    engine = sqlalchemy.create_engine("sqlite://")
+    table = sqlalchemy.Table(
+        "t",
+        sqlalchemy.MetaData(),
+        sqlalchemy.Column("id", sqlalchemy.Integer),
+        sqlalchemy.Column("rv", RowVersion()),
+    )
+    table.metadata.create_all(engine)
+    with engine.connect() as conn:
+        conn.execute(
+            table.insert(),
+            [{"id": i, "rv": (i * 255).to_bytes(8, "big")} for i in range(1, 5)]
+        )
+        rows = conn.execute(
+            table.select().where(table.c.rv > 510).order_by(table.c.rv)
+        ).fetchall()
+
+    assert [(row.id, row.rv) for row in rows] == [(3, 765), (4, 1020)]
+    assert mssqlConnector.org_to_jsonschema_type(mssql.TIMESTAMP()) == {"type": ["integer"]}
+
+
+def test_session_statements_and_prewarm(tmp_path):
+    """Session statements run on each new connection and prewarmed ones stay pooled."""
+    connector = mssqlConnector(
+        config={
+            "driver_type": "pymssql",
+            "session_statements": ["PRAGMA foreign_keys = ON"],
+            "prewarm_connections": 2,
+            # SQLite file databases default to NullPool
+            "sqlalchemy_eng_params": {
+                "poolclass": sqlalchemy.pool.QueuePool,
+                "pool_size": 2,
+            },
+        },
+        sqlalchemy_url=f"sqlite:///{tmp_path / 'pool.db'}",
+    )
+    engine = connector._engine
+    assert engine.pool.checkedin() == 2
+
+    with engine.connect() as conn:
+        assert conn.execute(sqlalchemy.text("PRAGMA foreign_keys")).scalar() == 1
+
+    # More than pool_size plus max_overflow would time out
+    connector = mssqlConnector(
+        config={
+            "driver_type": "pymssql",
+            "prewarm_connections": 10,
+            "sqlalchemy_eng_params": {
+                "poolclass": sqlalchemy.pool.QueuePool,
+                "pool_size": 2,
+                "max_overflow": 1,
+                "pool_timeout": 60,
+            },
+        },
+        sqlalchemy_url=f"sqlite:///{tmp_path / 'pool.db'}",
+    )
+    assert pool_capacity(connector._engine.pool) == 3
+    assert connector._engine.pool.checkedin() == 2
+    assert pool_capacity(sqlalchemy.pool.NullPool(lambda: None)) is None
+
+
+def test_read_options():
+    """Table read options override the global ones and end up in the query."""
+    stream = SimpleNamespace(
+        tap_stream_id="dbo-Sales",
+        timings=None,
+        fetch_sizer=None,
+        config={
+            "read_isolation": "snapshot",
+            "query_hints": ["MAXDOP 4"],
+            "table_read_options": [
+                {"table": "dbo-Sales", "read_isolation": "read_uncommitted"},
+                {"table": "dbo-Other", "query_hints": ["RECOMPILE"]},
+            ],
+        },
+    )
+    stream.read_options = mssqlStream.read_options.fget(stream)
+    assert stream.read_options == {
+        "read_isolation": "read_uncommitted",
+        "query_hints": ["MAXDOP 4"],
+    }
+
+    executed = []
+    stream.connector = SimpleNamespace(
+        stream_rows=lambda *args, **kwargs: executed.append(args) or iter([])
+    )
+    table = sqlalchemy.Table(
+        "Sales",
+        sqlalchemy.MetaData(),
+        sqlalchemy.Column("id", sqlalchemy.Integer),
+        schema="dbo",
+    )
+    mssqlStream.read_rows(stream, table.select().order_by(table.c.id), 100)
+
+    query, fetch_size, isolation_level = executed[0]
+    assert str(query.compile(dialect=mssql.dialect())).endswith(
+        "ORDER BY dbo.[Sales].id OPTION (MAXDOP 4)"
+    )
+    assert isolation_level == "READ UNCOMMITTED"
+
+
+def test_build_native_query():
+    """Temporal values are converted in SQL and varbinary by the driver."""
+    table = sqlalchemy.Table(
+        "Sales",
+        sqlalchemy.MetaData(),
+        sqlalchemy.Column("id", mssql.UNIQUEIDENTIFIER),
+        sqlalchemy.Column("updated", mssql.DATETIME2),
+        sqlalchemy.Column("created", mssql.DATETIMEOFFSET),
+        sqlalchemy.Column("day", mssql.DATE),
+        sqlalchemy.Column("token", mssql.UNIQUEIDENTIFIER),
+        sqlalchemy.Column("data", mssql.VARBINARY),
+        sqlalchemy.Column("version", RowVersion),
+        schema="dbo",
+    )
+
+    query, converted = build_native_query(table, "pymssql", ["id", "updated"])
+    assert converted == {"created", "day", "token"}
+    assert list(query.selected_columns.keys()) == [column.name for column in table.columns]
+    sql = str(query.compile(dialect=mssql.dialect()))
+    assert "CONVERT(VARCHAR(34), dbo.[Sales].created, 126) AS created" in sql
+    assert "CONVERT(CHAR(10), dbo.[Sales].day, 23) AS day" in sql
+    assert "LOWER(CONVERT(CHAR(36), dbo.[Sales].token)) AS token" in sql
+    assert "output_converters" not in query.get_execution_options()
+
+    query, converted = build_native_query(table, "pyodbc", ["id", "updated"])
+    assert converted == {"created", "day", "data"}
+    # The driver's base64 string skips the bytes() result processor
+    result_processor = query.selected_columns.data.type.result_processor(
+        mssql.dialect(), None
+    )
+    assert result_processor is None
+    converter = list(query.get_execution_options()["output_converters"].values())[0]
+    assert converter(b"\x00\x01") == binary_to_base64(b"\x00\x01")
+    assert converter(None) is None
+
+    # The converter would turn a VARBINARY key into a str too
+    query, converted = build_native_query(table, "pyodbc", ["id", "data"])
+    assert converted == {"updated", "created", "day"}
+    assert "output_converters" not in query.get_execution_options()
+    assert query.selected_columns.data.type.result_processor(
+        mssql.dialect(), None
+    ) is not None
+
+
+def test_lob_policies():
+    """LOB columns are selected and described by their policy."""
+    policies = [
+        {"table": "dbo-Docs", "column": "notes", "policy": "skip"},
+        {"table": "dbo-Docs", "column": "body", "policy": "truncate", "max_length": 100},
+        {"table": "dbo-Docs", "column": "xml", "policy": "hash"},
+        {"table": "dbo-Docs", "column": "scan", "policy": "file"},
+        {"table": "dbo-Docs", "column": "id", "policy": "skip"},
+    ]
+    catalog_entry = {
+        "tap_stream_id": "dbo-Docs",
+        "key_properties": ["id"],
+        "schema": {
+            "properties": {
+                name: {"type": ["string", "null"]}
+                for name in ("id", "notes", "body", "xml", "scan")
+            }
+        },
+        "metadata": [{"breadcrumb": ["properties", "notes"], "metadata": {}}],
+    }
+    Tapmssql.apply_lob_policies(catalog_entry, policies)
+    assert list(catalog_entry["schema"]["properties"]) == ["id", "body", "xml", "scan"]
+    assert catalog_entry["schema"]["properties"]["xml"]["maxLength"] == 64
+    assert catalog_entry["metadata"] == []
+
+    table = sqlalchemy.Table(
+        "Docs",
+        sqlalchemy.MetaData(),
+        sqlalchemy.Column("id", sqlalchemy.Integer),
+        sqlalchemy.Column("body", mssql.NVARCHAR),
+        sqlalchemy.Column("xml", mssql.XML),
+        sqlalchemy.Column("scan", mssql.VARBINARY),
+        schema="dbo",
+    )
+    stream = SimpleNamespace(
+        tap_stream_id="dbo-Docs",
+        replication_key=None,
+        primary_keys=["id"],
+        config={"lob_policies": policies},
+    )
+    stream.lob_policies = mssqlStream.lob_policies.fget(stream)
+    assert set(stream.lob_policies) == {"notes", "body", "xml", "scan"}
+
+    query, applied = mssqlStream.apply_lob_policies(stream, table.select(), table)
+    assert applied == {"body": "truncate", "xml": "hash", "scan": "file"}
+    assert list(query.selected_columns.keys()) == ["id", "body", "xml", "scan"]
+    sql = str(query.compile(dialect=mssql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert "SUBSTRING(dbo.[Docs].body, 1, 100) AS body" in sql
+    assert (
+        "LOWER(CONVERT(CHAR(64), HASHBYTES('SHA2_256', "
+        "CONVERT(NVARCHAR(MAX), dbo.[Docs].xml)), 2)) AS xml"
+    ) in sql
+    assert "DATALENGTH(dbo.[Docs].scan) AS scan" in sql
+
+
+def test_row_filters_and_computed_columns():
+    """Filters and computed columns are compiled into the query and schema."""
+    config = {
+        "row_filters": [
+            {"table": "dbo-Sales", "where": "SaleDate >= '2024-01-01'"},
+            {"table": "dbo-Other", "where": "1 = 0"},
+        ],
+        "computed_columns": [
+            {"table": "dbo-Sales", "column": "total", "expression": "qty * price", "type": "number"},
+            {"table": "dbo-Sales", "column": "note", "expression": "LEFT(note, 10)"},
+            {"table": "dbo-Sales", "column": "id", "expression": "id + 1", "type": "integer"},
+        ],
+    }
+    catalog_entry = {
+        "tap_stream_id": "dbo-Sales",
+        "key_properties": ["id"],
+        "schema": {"properties": {"id": {"type": ["integer"]}, "note": {"type": ["string"]}}},
+        "metadata": [],
+    }
+    Tapmssql.apply_computed_columns(catalog_entry, config["computed_columns"])
+    assert catalog_entry["schema"]["properties"] == {
+        "id": {"type": ["integer"]},
+        "note": {"type": ["string", "null"]},
+        "total": {"type": ["number", "null"]},
+    }
+    assert catalog_entry["metadata"] == [
+        {"breadcrumb": ["properties", "total"], "metadata": {"inclusion": "available"}}
+    ]
+
+    table = sqlalchemy.Table(
+        "Sales",
+        sqlalchemy.MetaData(),
+        sqlalchemy.Column("id", sqlalchemy.Integer),
+        schema="dbo",
+    )
+    stream = SimpleNamespace(
+        tap_stream_id="dbo-Sales",
+        replication_key=None,
+        primary_keys=["id"],
+        config=config,
+        connector=mssqlConnector,
+    )
+    computed_columns = mssqlStream.computed_columns.fget(stream)
+    assert list(computed_columns) == ["total", "note"]
+
+    query = mssqlStream.apply_computed_columns(stream, table.select(), computed_columns)
+    query = query.where(mssqlStream.row_filter.fget(stream))
+    assert list(query.selected_columns.keys()) == ["id", "total", "note"]
+    assert isinstance(query.selected_columns["total"].type, sqlalchemy.Numeric)
+    sql = str(query.compile(dialect=mssql.dialect()))
+    assert "(qty * price) AS total, (LEFT(note, 10)) AS note" in sql
+    assert "WHERE (SaleDate >= '2024-01-01')" in sql
+
+    stream.config = dict(config, change_tracking_tables=["dbo-Sales"])
+    assert mssqlStream.computed_columns.fget(stream) == {}
+
+
+def test_resumable_full_table():
+    """Bookmarked record keys compare as column values, only plain full table streams resume."""
+    moment = datetime.datetime(2024, 5, 6, 7, 8, 9, 123456)
+    assert from_bookmark_value(date_to_isoformat(moment), mssql.DATETIME2()) == moment
+    assert from_bookmark_value("2024-05-06", sqlalchemy.Date()) == datetime.date(2024, 5, 6)
+    assert from_bookmark_value(binary_to_base64(b"\x00\x01"), mssql.BINARY(2)) == b"\x00\x01"
+    assert from_bookmark_value(7, sqlalchemy.Integer()) == 7
+    assert from_bookmark_value("abc", mssql.UNIQUEIDENTIFIER()) == "abc"
+
+    stream = SimpleNamespace(
+        config={"resumable_full_table": True},
+        primary_keys=["id"],
+        replication_key=None,
+        partition_key=None,
+        change_tracking=False,
+        cdc_capture_instance=None,
+    )
+    assert mssqlStream.resumable_full_table.fget(stream)
+    stream.replication_key = "updated_at"
+    assert not mssqlStream.resumable_full_table.fget(stream)
+    stream.replication_key, stream.primary_keys = None, []
+    assert not mssqlStream.resumable_full_table.fget(stream)
+
+
+def test_prefetch_batches():
+    """Batches are read ahead in order, up to the limit, and errors come last."""
+    fetched = []
+
+    def batches():
+        for i in range(10):
+            fetched.append(i)
+            yield [i] * 3
+        raise ValueError("lost connection")
+
+    pipeline = prefetch_batches(batches(), max_rows=6)
+    assert next(pipeline) == [0, 0, 0]
+    time.sleep(0.1)
+    # One batch taken, two held, and one more waiting to be held
+    assert fetched == [0, 1, 2, 3]
+
+    received = []
+    with pytest.raises(ValueError):
+        for batch in pipeline:
+            received.append(batch[0])
+    assert received == list(range(1, 10))
+
+    closed = []
+
+    def endless():
+        try:
+            while True:
+                yield [(1,)]
+        finally:
+            closed.append(True)
+
+    pipeline = prefetch_batches(endless(), max_rows=1, max_bytes=10)
+    assert next(pipeline) == [(1,)]
+    pipeline.close()
+    assert closed == [True]
+
+
+def test_adaptive_batch_size(tmp_path):
+    """Batches are sized from the schema first and measured sizes after."""
+    schema = {
+        "properties": {
+            "id": {"type": ["integer"]},
+            "body": {"type": ["string", "null"]},
+        }
+    }
+    sizer = AdaptiveBatchSize(80000, estimate_record_size(schema))
+    assert sizer.size == 9
+
+    sizer.observe(10, 1000)
+    assert sizer.size == 800
+    sizer.observe(10, 3000)
+    assert sizer.size == 400
+    sizer.observe(0, 0)
+    assert sizer.size == 400
+
+    batch_config = BatchConfig.from_dict(
+        {
+            "encoding": {"format": "jsonl", "compression": "gzip"},
+            "storage": {"root": f"file://{tmp_path}"},
+            "batch_size": 1000,
+        }
+    )
+    batcher = JSONLinesBatcher(
+        "tap-mssql",
+        "dbo-test",
+        batch_config,
+        sizer=AdaptiveBatchSize(1000, 100),
+    )
+    records = [{"id": i, "body": "x" * 90} for i in range(100)]
+    chunks = list(batcher.iter_chunks(iter(records)))
+    # The first chunk uses the estimate, then lines measured at 114 bytes
+    assert [len(chunk) for chunk in chunks[:2]] == [10, 8]
+    assert sum(chunks, []) == records
@@ -0,0 +1,45 @@
+"""Tests the per-stream timings and their export."""
+
+import json
+
+from tap_mssql.instrumentation import (
+    StreamTimings,
+    format_prometheus,
+    write_metrics_file,
+)
+
+
+def test_stream_timings():
+    """Fetches are timed and counted, stages add up."""
+    timings = StreamTimings('dbo-"Sales"')
+    batches = list(timings.timed_batches(iter([[1, 2], [3]])))
+    with timings.time("transform"):
+        pass
+    timings.add("write", 0.5, size=10)
+    timings.finish()
+
+    assert batches == [[1, 2], [3]]
+    assert timings.rows == 3
+    assert timings.bytes == 10
+    assert timings.durations["write"] == 0.5
+    assert timings.durations["fetch"] > 0
+    assert {point.metric.value for point in timings.points()} == {
+        "stage_duration", "sync_duration", "fetched_rows", "written_bytes"
+    }
+
+    text = format_prometheus([timings])
+    assert 'tap_mssql_stage_seconds{stream="dbo-\\"Sales\\"",stage="write"} 0.500000' in text
+    assert 'tap_mssql_rows_total{stream="dbo-\\"Sales\\""} 3' in text
+
+
+def test_write_metrics_file(tmp_path):
+    """The JSON summary has every stream's breakdown."""
+    timings = StreamTimings("dbo-Sales")
+    timings.add("query", 1.0)
+    path = tmp_path / "metrics" / "tap.json"
+    write_metrics_file(path, [timings])
+
+    summary = json.loads(path.read_text())
+    assert summary["streams"][0]["stream"] == "dbo-Sales"
+    assert summary["streams"][0]["stage_seconds"]["query"] == 1.0
+    assert list(path.parent.iterdir()) == [path]
@@ -0,0 +1,113 @@
+"""Tests partitioned full table reads on SQLite."""
+
+import datetime
+import json
+
+from types import SimpleNamespace
+
+import sqlalchemy
+
+from sqlalchemy.dialects import mssql
+
+from tap_mssql.client import mssqlConnector, mssqlStream, split_range
+from tap_mssql.tap import Tapmssql
+
+
+def sync_items(tmp_path, capsys, keys, partition_key="k") -> list[int]:
+    """Sync a table with the given partition key values in 4 partitions.
+
+    Returns:
+        The ids of the records synced, in the order they were written.
+    """
+    db_path = tmp_path / "items.db"
+    engine = sqlalchemy.create_engine(f"sqlite:///{db_path}")
+    meta = sqlalchemy.MetaData()
+    items = sqlalchemy.Table(
+        "items",
+        meta,
+        sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+        sqlalchemy.Column("k", sqlalchemy.Integer),
+        sqlalchemy.Column("name", sqlalchemy.String(20)),
+    )
+    meta.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            items.insert(),
+            [{"id": i, "k": k, "name": f"item {i}"} for i, k in enumerate(keys)]
+        )
+
+    config = {
+        "driver_type": "pymssql",
+        "host": "localhost",
+        "user": "user",
+        "password": "password",
+        "database": "test",
+        "partition_count": 4,
+        "partition_workers": 2,
+        "partition_keys": [{"table": "main-items", "partition_key": partition_key}],
+    }
+    connector = mssqlConnector(config=config, sqlalchemy_url=f"sqlite:///{db_path}")
+    catalog_entries = connector.discover_catalog_entries()
+    for catalog_entry in catalog_entries:
+        for metadata in catalog_entry["metadata"]:
+            metadata["metadata"]["selected"] = True
+
+    tap = Tapmssql(
+        config=config,
+        catalog={"streams": catalog_entries},
+        parse_env_config=False,
+        validate_config=False,
+    )
+    tap._tap_connector = connector
+    tap.sync_streams()
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    return [message["record"]["id"] for message in messages if message["type"] == "RECORD"]
+
+
+def test_split_range():
+    """Ranges split evenly and never repeat a boundary."""
+    assert split_range(0, 100, 4) == [25, 50, 75]
+    assert split_range(1, 3, 4) == [2]
+    assert split_range(5, 5, 4) == []
+    assert split_range(
+        datetime.datetime(2023, 1, 1),
+        datetime.datetime(2023, 1, 3),
+        2
+    ) == [datetime.datetime(2023, 1, 2)]
+
+
+def test_null_and_skewed_keys(tmp_path, capsys):
+    """NULL keys and ranges holding almost every row are read once each."""
+    keys = [None] * 5 + [1] * 50 + [2, 3, 10 ** 6]
+    ids = sync_items(tmp_path, capsys, keys)
+    assert sorted(ids) == list(range(len(keys)))
+
+
+def test_single_row_table(tmp_path, capsys):
+    """A table with one key value is read as one range."""
+    assert sync_items(tmp_path, capsys, [7]) == [0]
+
+
+def test_non_numeric_key_is_not_partitioned(tmp_path, capsys):
+    """Keys that can't be split into ranges fall back to one read."""
+    ids = sync_items(tmp_path, capsys, [1, 2, 3], partition_key="name")
+    assert sorted(ids) == [0, 1, 2]
+
+    # SQLAlchemy has no Python type for UNIQUEIDENTIFIER
+    table = sqlalchemy.Table(
+        "Orders",
+        sqlalchemy.MetaData(),
+        sqlalchemy.Column("id", mssql.UNIQUEIDENTIFIER),
+        sqlalchemy.Column("name", sqlalchemy.String(20)),
+    )
+    for partition_key in ("id", "name"):
+        warnings = []
+        stream = SimpleNamespace(
+            name="dbo-Orders",
+            partition_key=partition_key,
+            logger=SimpleNamespace(warning=warnings.append),
+            connector=None,
+        )
+        assert mssqlStream.get_partition_contexts(stream, table) is None
+        assert f"can't be partitioned on column '{partition_key}'" in warnings[0]
@@ -0,0 +1,89 @@
+"""Tests the orjson serializer writes the same values as the json one."""
+
+import datetime
+import json
+
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from sqlalchemy.sql.elements import quoted_name
+
+from tap_mssql.client import CustomJSONEncoder, mssqlStream
+from tap_mssql.serializers import JSONSerializer, OrjsonSerializer, get_serializer
+
+RECORD = {
+    "id": 1,
+    "big": 2**70,
+    "name": "Zoë",
+    "price": Decimal("1.50"),
+    "created": datetime.datetime(2020, 1, 1, 1, 2, 3),
+    "birthday": datetime.date(2020, 1, 1),
+    "start": datetime.time(1, 2, 3, 4000),
+    "active": True,
+    "note": None,
+}
+
+
+def test_batch_lines_parity():
+    """Batch lines decode to the same values with either serializer."""
+    pytest.importorskip("orjson")
+    records = [RECORD, {quoted_name("id", None): 2}]
+
+    expected = JSONSerializer(CustomJSONEncoder).encode_lines(records)
+    actual = OrjsonSerializer(CustomJSONEncoder).encode_lines(records)
+
+    assert actual.endswith(b'\n{"id":2}\n')
+    assert [json.loads(line) for line in actual.splitlines()] == [
+        json.loads(line) for line in expected.splitlines()
+    ]
+
+
+def test_message_parity():
+    """Messages keep Decimals as numbers and time_extracted as str()."""
+    pytest.importorskip("orjson")
+    message = {
+        "type": "RECORD",
+        "stream": "dbo-test",
+        "record": {"id": 1, "price": Decimal("1.50"), "name": "Zoë"},
+        "time_extracted": datetime.datetime(
+            2020, 1, 1, 1, 2, 3, tzinfo=datetime.timezone.utc
+        ),
+    }
+    expected = JSONSerializer().format_message(message)
+    actual = OrjsonSerializer().format_message(message)
+
+    assert json.loads(actual, parse_float=Decimal) == json.loads(
+        expected, parse_float=Decimal
+    )
+    assert '1.50' in actual
+    assert json.loads(actual)["time_extracted"] == "2020-01-01 01:02:03+00:00"
+
+    del message["record"]["price"]
+    assert OrjsonSerializer().format_message(message).startswith('{"type":"RECORD"')
+
+
+def test_get_serializer():
+    """Serializers are picked by name."""
+    assert type(get_serializer("json")) is JSONSerializer
+    with pytest.raises(ValueError):
+        get_serializer("yaml")
+
+
+def test_orjson_without_fragment_warns(monkeypatch):
+    """An orjson without Fragment is reported when the stream picks it."""
+    pytest.importorskip("orjson")
+    monkeypatch.setattr(
+        "tap_mssql.client.orjson",
+        SimpleNamespace(__version__="3.8.3")
+    )
+    warnings = []
+    stream = SimpleNamespace(
+        _serializer=None,
+        config={"json_serializer": "orjson"},
+        logger=SimpleNamespace(warning=lambda *args: warnings.append(args)),
+    )
+    assert type(mssqlStream.serializer.fget(stream)) is OrjsonSerializer
+    assert "has no Fragment" in warnings[0][0]
+
@@ -0,0 +1,374 @@
+"""Tests whole tap syncs on SQLite."""
+
+import datetime
+import json
+
+import pytest
+import sqlalchemy
+
+from tap_mssql.client import mssqlConnector, mssqlStream
+from tap_mssql.tap import Tapmssql
+
+CONFIG = {
+    "driver_type": "pymssql",
+    "host": "localhost",
+    "user": "user",
+    "password": "password",
+    "database": "test",
+}
+
+
+def create_tables(db_path, count: int, rows: int) -> None:
+    """Create tables t0..t<count> with an id and an `updated` counter."""
+    engine = sqlalchemy.create_engine(f"sqlite:///{db_path}")
+    meta = sqlalchemy.MetaData()
+    tables = [
+        sqlalchemy.Table(
+            f"t{i}",
+            meta,
+            sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column("updated", sqlalchemy.Integer),
+        )
+        for i in range(count)
+    ]
+    meta.create_all(engine)
+    with engine.begin() as conn:
+        for table in tables:
+            # Stored out of replication key order
+            conn.execute(
+                table.insert(),
+                [{"id": i, "updated": rows - i} for i in range(rows)]
+            )
+
+
+def sync(
+        db_path,
+        capsys,
+        config: dict,
+        replication_key: str | None = None,
+        sync_method: str = "sync_streams",
+        state: dict | None = None,
+     ) -> list[dict]:
+    """Sync every table in the database with the tap's sync_method.
+
+    Returns:
+        The Singer messages written.
+    """
+    config = dict(CONFIG, **config)
+    connector = mssqlConnector(config=config, sqlalchemy_url=f"sqlite:///{db_path}")
+    catalog_entries = connector.discover_catalog_entries()
+    for catalog_entry in catalog_entries:
+        catalog_entry["replication_key"] = replication_key
+        for metadata in catalog_entry["metadata"]:
+            metadata["metadata"]["selected"] = True
+
+    tap = Tapmssql(
+        config=config,
+        catalog={"streams": catalog_entries},
+        state=state,
+        parse_env_config=False,
+        validate_config=False,
+    )
+    tap._tap_connector = connector
+    getattr(tap, sync_method)()
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def test_concurrent_streams(tmp_path, capsys, monkeypatch):
+    """Streams synced at the same time keep their messages and state in order."""
+    db_path = tmp_path / "tap.db"
+    create_tables(db_path, count=4, rows=30)
+    monkeypatch.setattr(mssqlStream, "STATE_MSG_FREQUENCY", 7)
+
+    messages = sync(
+        db_path,
+        capsys,
+        {"max_concurrent_streams": 3, "fetch_size": 4},
+        replication_key="updated",
+    )
+    stream_ids = [f"main-t{i}" for i in range(4)]
+
+    for stream_id in stream_ids:
+        stream_messages = [
+            message for message in messages
+            if message.get("stream") == stream_id
+        ]
+        assert stream_messages[0]["type"] == "SCHEMA"
+        assert [
+            message["record"]["updated"] for message in stream_messages[1:]
+        ] == list(range(1, 31))
+
+        bookmarks = [
+            message["value"]["bookmarks"][stream_id]["replication_key_value"]
+            for message in messages
+            if message["type"] == "STATE"
+            and "replication_key_value" in message["value"]
+            .get("bookmarks", {}).get(stream_id, {})
+        ]
+        assert bookmarks == sorted(bookmarks)
+        assert bookmarks[-1] == 30
+
+    final_state = [message for message in messages if message["type"] == "STATE"][-1]
+    sequential_state = [
+        message for message in sync(db_path, capsys, {}, replication_key="updated")
+        if message["type"] == "STATE"
+    ][-1]
+    assert final_state == sequential_state
+
+
+@pytest.mark.parametrize("rows", [20, 25])
+@pytest.mark.parametrize("replication_key", ["updated", None])
+def test_batch_workers_state(tmp_path, capsys, rows, replication_key):
+    """Batch workers end with the same state as one batch at a time.
+
+    With a row count that is a multiple of the batch size the last
+    batch is full and must still be followed by the final state.
+    """
+    db_path = tmp_path / "tap.db"
+    create_tables(db_path, count=1, rows=rows)
+
+    def state_messages(workers: int) -> list[dict]:
+        config = {
+            "batch_workers": workers,
+            "resumable_full_table": True,
+            "batch_config": {
+                "encoding": {"format": "jsonl", "compression": "gzip"},
+                "storage": {"root": f"file://{tmp_path / str(workers)}"},
+                "batch_size": 10,
+            },
+        }
+        states = [
+            message["value"]["bookmarks"]["main-t0"]
+            for message in sync(db_path, capsys, config, replication_key)
+            if message["type"] == "STATE" and message["value"]
+        ]
+        for state in states:
+            # A new time each sync
+            if "full_table_completed_at" in state:
+                state["full_table_completed_at"] = "done"
+        return states
+
+    states = state_messages(0)
+    if replication_key:
+        assert states[-1]["replication_key_value"] == rows
+    else:
+        assert states[-1] == {"full_table_completed_at": "done"}
+    for workers in (1, 2):
+        worker_states = state_messages(workers)
+        assert worker_states[-1] == states[-1]
+        assert all(state in states for state in worker_states)
+
+
+def test_keyset_collation_order(tmp_path, capsys):
+    """Keyset pages keep the server order of a case insensitive key."""
+    db_path = tmp_path / "tap.db"
+    engine = sqlalchemy.create_engine(f"sqlite:///{db_path}")
+    meta = sqlalchemy.MetaData()
+    names = sqlalchemy.Table(
+        "names",
+        meta,
+        sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+        sqlalchemy.Column("name", sqlalchemy.String(20, collation="NOCASE")),
+    )
+    meta.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            names.insert(),
+            [{"id": i, "name": name} for i, name in enumerate(["b", "C", "a", "B"])]
+        )
+
+    messages = sync(
+        db_path,
+        capsys,
+        {"keyset_page_size": 2},
+        replication_key="name",
+    )
+    assert [
+        message["record"]["id"] for message in messages if message["type"] == "RECORD"
+    ] == [2, 0, 3, 1]
+    assert messages[-1]["value"]["bookmarks"]["main-names"][
+        "replication_key_value"
+    ] == "C"
+
+
+@pytest.mark.parametrize(
+    "max_concurrent_streams,sync_method",
+    [(1, "sync_all"), (1, "sync_streams"), (2, "sync_streams")]
+)
+def test_stream_metrics_and_profiles(tmp_path, capsys, max_concurrent_streams, sync_method):
+    """Each stream is profiled and timed however the tap is synced."""
+    db_path = tmp_path / "tap.db"
+    create_tables(db_path, count=2, rows=5)
+    metrics_file = tmp_path / "metrics.json"
+
+    sync(
+        db_path,
+        capsys,
+        {
+            "max_concurrent_streams": max_concurrent_streams,
+            "metrics_file": str(metrics_file),
+            "profiler": "cprofile",
+            "profile_dir": str(tmp_path / "profiles"),
+        },
+        sync_method=sync_method,
+    )
+
+    streams = json.loads(metrics_file.read_text())["streams"]
+    assert {stream["stream"]: stream["rows"] for stream in streams} == {
+        "main-t0": 5,
+        "main-t1": 5,
+    }
+    assert all(stream["sync_seconds"] is not None for stream in streams)
+    assert sorted(path.name for path in (tmp_path / "profiles").iterdir()) == [
+        "main-t0.prof",
+        "main-t1.prof",
+    ]
+
+
+def test_parquet_computed_columns(tmp_path, capsys):
+    """Parquet batch files type computed columns by their setting."""
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    db_path = tmp_path / "tap.db"
+    create_tables(db_path, count=1, rows=3)
+
+    config = {
+        "computed_columns": [
+            # Replaces the integer column
+            {
+                "table": "main-t0",
+                "column": "updated",
+                "expression": "'v' || updated",
+                "type": "string",
+            },
+            {
+                "table": "main-t0",
+                "column": "doubled",
+                "expression": "updated * 2",
+                "type": "integer",
+            },
+        ],
+        "batch_config": {
+            "encoding": {"format": "parquet", "compression": "gzip"},
+            "storage": {"root": f"file://{tmp_path / 'batches'}"},
+        },
+    }
+    config = dict(CONFIG, **config)
+    connector = mssqlConnector(config=config, sqlalchemy_url=f"sqlite:///{db_path}")
+    catalog_entries = connector.discover_catalog_entries()
+    for catalog_entry in catalog_entries:
+        Tapmssql.apply_computed_columns(catalog_entry, config["computed_columns"])
+        for metadata in catalog_entry["metadata"]:
+            metadata["metadata"]["selected"] = True
+
+    tap = Tapmssql(
+        config=config,
+        catalog={"streams": catalog_entries},
+        parse_env_config=False,
+        validate_config=False,
+    )
+    tap._tap_connector = connector
+    tap.sync_streams()
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    manifest = [message for message in messages if message["type"] == "BATCH"][0]["manifest"]
+    table = pyarrow_parquet.read_table(manifest[0].replace("file://", ""))
+    assert str(table.schema.field("updated").type) == "string"
+    assert str(table.schema.field("doubled").type) == "int32"
+    assert table.to_pylist() == [
+        {"id": 0, "updated": "v3", "doubled": 6},
+        {"id": 1, "updated": "v2", "doubled": 4},
+        {"id": 2, "updated": "v1", "doubled": 2},
+    ]
+
+
+def test_sync_all_after_concurrent_sync(tmp_path, capsys, monkeypatch):
+    """sync_all() runs after a concurrent sync and warns it isn't concurrent."""
+    db_path = tmp_path / "tap.db"
+    create_tables(db_path, count=2, rows=5)
+    config = dict(CONFIG, max_concurrent_streams=2)
+    connector = mssqlConnector(config=config, sqlalchemy_url=f"sqlite:///{db_path}")
+    catalog_entries = connector.discover_catalog_entries()
+    for catalog_entry in catalog_entries:
+        for metadata in catalog_entry["metadata"]:
+            metadata["metadata"]["selected"] = True
+
+    tap = Tapmssql(
+        config=config,
+        catalog={"streams": catalog_entries},
+        parse_env_config=False,
+        validate_config=False,
+    )
+    tap._tap_connector = connector
+    warnings = []
+    monkeypatch.setattr(tap.logger, "warning", lambda message, *args: warnings.append(message))
+
+    tap.sync_streams()
+    assert all(stream.sync_lock is None for stream in tap.streams.values())
+    assert not any("synced one at a time" in warning for warning in warnings)
+
+    tap.sync_all()
+    records = [
+        message for message in map(json.loads, capsys.readouterr().out.splitlines())
+        if message["type"] == "RECORD"
+    ]
+    assert len(records) == 20
+    assert any("synced one at a time" in warning for warning in warnings)
+
+
+def test_resume_parquet_datetime_and_binary_keys(tmp_path, capsys):
+    """Parquet batches bookmark datetime and binary keys a resumed sync can read."""
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    db_path = tmp_path / "tap.db"
+    engine = sqlalchemy.create_engine(f"sqlite:///{db_path}")
+    meta = sqlalchemy.MetaData()
+    events = sqlalchemy.Table(
+        "events",
+        meta,
+        sqlalchemy.Column("created", sqlalchemy.DateTime, primary_key=True),
+        sqlalchemy.Column("token", sqlalchemy.LargeBinary, primary_key=True),
+        sqlalchemy.Column("id", sqlalchemy.Integer),
+    )
+    meta.create_all(engine)
+    start = datetime.datetime(2024, 1, 2, 3, 4, 5, 678000)
+    with engine.begin() as conn:
+        conn.execute(
+            events.insert(),
+            [
+                {
+                    "created": start + datetime.timedelta(days=i // 2),
+                    "token": bytes([i, 255]),
+                    "id": i,
+                }
+                for i in range(6)
+            ]
+        )
+
+    config = {
+        "resumable_full_table": True,
+        "batch_config": {
+            "encoding": {"format": "parquet", "compression": "gzip"},
+            "storage": {"root": f"file://{tmp_path / 'batches'}"},
+            "batch_size": 2,
+        },
+    }
+    messages = sync(db_path, capsys, config)
+    states = [
+        message["value"] for message in messages
+        if message["type"] == "STATE"
+        and "full_table_bookmark" in message["value"].get("bookmarks", {})
+        .get("main-events", {})
+    ]
+    assert states[0]["bookmarks"]["main-events"]["full_table_bookmark"] == [
+        "2024-01-02T03:04:05.678000",
+        "Af8=",
+    ]
+
+    # Resume after the first batch
+    messages = sync(db_path, capsys, config, state=states[0])
+    ids = [
+        record["id"]
+        for message in messages if message["type"] == "BATCH"
+        for path in message["manifest"]
+        for record in pyarrow_parquet.read_table(path.replace("file://", "")).to_pylist()
+    ]
+    assert ids == [2, 3, 4, 5]